@@ -0,0 +1,81 @@
+"""Cold-start time to first render per page, with a ``-X importtime`` profile.
+
+    LLM_BACKEND=stub python -m benchmarks.cold_start [--repeat 3] [-o benchmarks/importtime.txt]
+
+Each page is rendered once with ``AppTest`` in a fresh interpreter started
+with ``-X importtime``. The AppTest harness is imported before the clock
+starts. The reported time therefore covers what a new session pays: the
+page's own imports plus its first script run. The report lists the best
+time over ``--repeat`` processes and the heaviest top-level imports made
+while the page ran.
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGES = sorted(f[:-3] for f in os.listdir(os.path.join(ROOT, "pages")) if f.endswith(".py"))
+MARKER = "--- page run ---"
+
+# Runs in the child interpreter
+_CHILD = f"""
+import os, sys, time
+from streamlit.testing.v1 import AppTest
+sys.stderr.write({MARKER!r} + "\\n")
+sys.stderr.flush()
+start = time.perf_counter()
+at = AppTest.from_file(sys.argv[1], default_timeout=120).run()
+elapsed = time.perf_counter() - start
+if at.exception:
+    raise SystemExit(at.exception[0].value)
+print(elapsed)
+"""
+
+
+def profile_page(page):
+    """``(seconds to first render, [(cumulative_us, module)] imported during the run)``."""
+    env = dict(os.environ, PYTHONPATH=ROOT, LLM_BACKEND=os.getenv("LLM_BACKEND", "stub"))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _CHILD, os.path.join(ROOT, "pages", f"{page}.py")],
+        capture_output=True, text=True, cwd=ROOT, env=env, check=False)
+    if proc.returncode:
+        raise RuntimeError(f"{page}: {proc.stderr.strip().splitlines()[-1]}")
+    imports = []
+    for line in proc.stderr.split(MARKER, 1)[-1].splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, name = line.split(":", 1)[1].split("|")
+        if name.startswith(" ") and not name.startswith("  "):  # top level only
+            imports.append((int(cumulative), name.strip()))
+    return float(proc.stdout.strip().splitlines()[-1]), sorted(imports, reverse=True)
+
+
+def report(pages, repeat=3, top=8):
+    lines = [f"{'page':<22}{'first render s':>15}{'imports s':>11}  heaviest imports (cumulative ms)"]
+    for page in pages:
+        runs = [profile_page(page) for _ in range(repeat)]
+        seconds, imports = min(runs, key=lambda r: r[0])
+        total = sum(us for us, _ in imports) / 1e6
+        heaviest = ", ".join(f"{name} {us / 1000:.0f}" for us, name in imports[:top])
+        lines.append(f"{page:<22}{seconds:>15.3f}{total:>11.3f}  {heaviest}")
+    return "\n".join(lines) + "\n"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("pages", nargs="*", default=PAGES, help="page names (default: all)")
+    parser.add_argument("--repeat", type=int, default=3, help="fresh processes per page (best kept)")
+    parser.add_argument("-o", "--output", help="also write the report to this file")
+    args = parser.parse_args(argv)
+
+    text = report(args.pages, args.repeat)
+    print(text, end="")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            fh.write(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
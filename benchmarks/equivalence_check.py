@@ -0,0 +1,128 @@
+"""Checks that the fast paths give the same numbers as the reference ones.
+
+    python -m benchmarks.equivalence_check
+
+* ``DealSimulation.update`` against a fresh ``deal_partner.simulate`` with
+  the same seed, after a lever change that reaches each stage in
+  ``deal_partner.STAGES``. Levers are changed one after another on the same
+  live simulation, as on the page.
+* ``finance.irr`` (vectorized Newton) against a per-row polynomial-root
+  IRR, computed the way ``numpy_financial.irr`` does, on mixed-sign cash
+  flows. Rows where that reference has no root must come back NaN. Rows
+  with several valid IRRs are skipped, because the two methods may
+  legitimately pick different roots.
+
+Exits 1 on the first mismatch. No network or API key is needed.
+"""
+from dataclasses import replace
+import os
+import sys
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from core.engine import deal_partner, finance  # noqa: E402
+
+SEED = 11
+N_RUNS = 2_000
+IRR_TOL = 1e-8  # percentage points for IRR paths; fractions for finance.irr
+REL_TOL = 1e-12
+
+# (lever change, stage it must recompute), applied cumulatively
+LEVER_STEPS = [
+    ({"churn": 12}, "churn"),
+    ({"pricing_power": 7}, "growth"),
+    ({"margin": 25}, "margin"),
+    ({"exit_multiple": 12}, "multiple"),
+    ({"revenue0": 150}, "revenue"),
+    ({"purchase_price": 260}, "irr"),
+    ({"macro_shock": "Severe Recession"}, "margin"),
+    ({"management_response": False}, "margin"),
+    ({"retention_action": False, "pricing_backlash": False}, "churn"),
+    ({"years": 7}, "revenue"),
+]
+
+
+def _check(ok, message):
+    if not ok:
+        raise AssertionError(message)
+    print(f"ok   {message}")
+
+
+def _max_diff(a, b):
+    return float(np.max(np.abs(a - b))) if a.size else 0.0
+
+
+def check_incremental_matches_fresh():
+    params = deal_partner.DealParams.from_preset("Base")
+    sim = deal_partner.DealSimulation(N_RUNS, SEED)
+    sim.update(params)
+    for change, stage in LEVER_STEPS:
+        params = replace(params, **change)
+        live = sim.update(params)
+        fresh = deal_partner.simulate(params, N_RUNS, seed=SEED)
+        label = ", ".join(f"{k}={v!r}" for k, v in change.items())
+        _check(stage in sim.recomputed, f"{label}: recomputes {stage} ({', '.join(sim.recomputed)})")
+        _check(live.irr.shape == fresh.irr.shape and _max_diff(live.irr, fresh.irr) <= IRR_TOL,
+               f"{label}: IRR paths match a fresh simulate (max diff {_max_diff(live.irr, fresh.irr):.1e})")
+        for name in ("moic", "exit_value"):
+            a, b = getattr(live, name), getattr(fresh, name)
+            _check(np.allclose(a, b, rtol=REL_TOL, atol=0), f"{label}: {name} paths match")
+        _check(live.rules == fresh.rules, f"{label}: the same persona rules fire")
+
+
+def _reference_irr(row):
+    """All valid IRRs of one row, from the roots of its NPV polynomial."""
+    roots = np.roots(row[::-1])
+    roots = roots[(np.abs(roots.imag) < 1e-12) & (roots.real > 0)].real
+    return 1 / roots - 1
+
+
+def check_irr_matches_reference():
+    rng = np.random.default_rng(SEED)
+    n, periods = 2_000, 6
+    cf = np.empty((n, periods + 1))
+    cf[:, 0] = -100
+    cf[:, 1:] = rng.normal(15, 30, (n, periods))  # some interior flows are negative
+    cf[:, -1] += rng.uniform(-50, 200, n)
+    got = finance.irr(cf)
+    compared = no_root = skipped = 0
+    worst = 0.0
+    for row, rate in zip(cf, got):
+        ref = _reference_irr(row)
+        if ref.size == 0:
+            no_root += 1
+            if not np.isnan(rate):
+                raise AssertionError(f"finance.irr {rate!r} for a row without a real IRR: {row.tolist()}")
+            continue
+        if ref.size > 1:
+            skipped += 1
+            continue
+        compared += 1
+        worst = max(worst, abs(rate - ref[0]))
+        if not abs(rate - ref[0]) <= IRR_TOL:
+            raise AssertionError(f"finance.irr {rate!r} vs reference {ref[0]!r} for {row.tolist()}")
+    _check(compared > n // 2, f"finance.irr matches the reference on {compared} rows (max diff {worst:.1e}); "
+                              f"{no_root} rootless rows are NaN, {skipped} multi-root rows skipped")
+    warm = finance.irr(cf, guess=np.where(np.isfinite(got), got, 0.1))
+    both = np.isfinite(got)
+    _check(np.array_equal(np.isfinite(warm), both) and _max_diff(warm[both], got[both]) <= IRR_TOL,
+           "a per-row warm-start guess gives the same IRRs")
+
+
+def main():
+    checks = [check_incremental_matches_fresh, check_irr_matches_reference]
+    try:
+        for check in checks:
+            check()
+    except AssertionError as e:
+        print(f"FAIL {e}", file=sys.stderr)
+        return 1
+    print(f"{len(checks)} equivalence checks passed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
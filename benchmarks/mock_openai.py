@@ -0,0 +1,125 @@
+"""Check the pooled OpenAI client against a local mock server.
+
+    python -m benchmarks.mock_openai [--requests 20] [--fail-every 3]
+
+Starts a stdlib HTTP server that speaks just enough of
+``/v1/chat/completions`` for the OpenAI SDK. Every ``--fail-every``-th
+request is answered with a 429 (``Retry-After: 0``) or a 503, alternately.
+The script then sends ``--requests`` completions through
+``PooledClient.call``, with ``OPENAI_BASE_URL`` pointed at the mock, and
+checks that:
+
+* every request eventually succeeds, through retries only;
+* the client's retry count matches the failures the server injected;
+* all requests reuse the keep-alive pool (few TCP connections);
+* the metrics reach ``tracing.render_prometheus()``.
+
+Exits 1 if a check fails. No network or API key is needed.
+"""
+import argparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import os
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from core import tracing  # noqa: E402
+from core.llm.client import PooledClient, RetryPolicy  # noqa: E402
+
+
+class MockServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, fail_every):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.fail_every = fail_every
+        self.requests = self.injected = 0
+        self.connections = set()
+        self.lock = threading.Lock()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so connection reuse is visible
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("content-length") or 0))
+        server = self.server
+        with server.lock:
+            server.requests += 1
+            server.connections.add(self.client_address)
+            fail = server.fail_every and server.requests % server.fail_every == 0
+            if fail:
+                server.injected += 1
+                status = 429 if server.injected % 2 else 503
+        if fail:
+            self._send(status, {"error": {"message": "injected", "type": "mock"}}, {"Retry-After": "0"})
+            return
+        self._send(200, {
+            "id": f"mock-{server.requests}", "object": "chat.completion", "created": int(time.time()),
+            "model": "mock",
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": "ok"}}],
+            "usage": {"prompt_tokens": 5, "completion_tokens": 1, "total_tokens": 6},
+        })
+
+    def _send(self, status, doc, headers=None):
+        body = json.dumps(doc).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def run(n_requests, fail_every):
+    server = MockServer(fail_every)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    pool = PooledClient(api_key="mock", rpm=60_000, tpm=10**9, pool_size=4,
+                        retry=RetryPolicy(max_retries=3, base=0.01))
+    tracing.add_gauges("llm_client", pool.metrics.snapshot)
+    replies = [
+        pool.call(lambda client: client.chat.completions.create(
+            model="mock", messages=[{"role": "user", "content": "ping"}]))
+        for _ in range(n_requests)
+    ]
+    server.shutdown()
+    return server, pool.metrics.snapshot(), replies
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--fail-every", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    tracing.enable()
+    server, snap, replies = run(args.requests, args.fail_every)
+    print(json.dumps(snap, indent=2))
+    print(f"server saw {server.requests} requests ({server.injected} injected failures) "
+          f"on {len(server.connections)} connection(s)")
+    checks = [
+        (all(r.choices[0].message.content == "ok" for r in replies), "every request succeeded"),
+        (snap["requests"] == args.requests and snap["failures"] == 0, "no request failed for good"),
+        (snap["retries"] == server.injected, "each injected 429/503 was retried once"),
+        (len(server.connections) <= 4, "requests reused the keep-alive pool"),
+        ("app_llm_client_retries " in tracing.render_prometheus(), "metrics are exported to Prometheus"),
+    ]
+    failed = False
+    for ok, message in checks:
+        print(f"{'ok  ' if ok else 'FAIL'} {message}")
+        failed |= not ok
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
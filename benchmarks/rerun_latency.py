@@ -0,0 +1,106 @@
+"""Rerun latency of each role page after a single widget change.
+
+    LLM_BACKEND=stub python -m benchmarks.rerun_latency [--repeat 9] [page ...]
+
+Every page is loaded headless with ``streamlit.testing.v1.AppTest``, its
+Monte Carlo is run once, and then each interaction below is replayed
+``--repeat`` times, alternating between two widget values. The median and
+worst wall time per rerun are reported in milliseconds.
+
+AppTest always reruns the whole script, so for widgets inside a
+``st.fragment`` (the AI review sections) the figure is an upper bound: in a
+browser session only the fragment reruns.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+from streamlit.testing.v1 import AppTest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# page -> (button that runs its Monte Carlo or None, [(interaction, widget kind, label, (a, b))])
+PAGES = {
+    "1_Deal_Partner": ("Run Monte Carlo Simulation", [
+        ("growth slider", "slider", "Revenue Growth (%)", (10, 12)),
+        ("persona dropdown", "selectbox", "Choose AI Persona", ("CFO", "Deal Partner")),
+    ]),
+    "2_VP": ("Run Monte Carlo", [
+        ("multiple slider", "slider", "EBITDA Multiple", (9.0, 9.5)),
+        ("persona dropdown", "selectbox", "Choose AI Persona", ("CFO", "VP")),
+    ]),
+    "3_Associate": ("Run Monte Carlo Scenario", [
+        ("sensitivity metric", "selectbox", "Metric for Sensitivity", ("EBITDA", "Revenue")),
+        ("persona dropdown", "selectbox", "Choose AI Persona", ("VP", "Associate")),
+    ]),
+    "4_Operating_Partner": ("Run Monte Carlo", [
+        ("pricing slider", "slider", "Pricing Initiative (% Revenue Impact)", (6, 8)),
+        ("persona dropdown", "selectbox", "AI Persona", ("CFO", "Operating Partner")),
+    ]),
+    "5_CxO": (None, [
+        ("sales budget slider", "slider", "Sales Budget", (550, 600)),
+        ("persona dropdown", "selectbox", "CxO Persona", ("CFO", "CEO")),
+    ]),
+    "6_Management_Team": (None, [
+        ("zoom slider", "slider", "Zoom date range", None),
+        ("persona dropdown", "selectbox", "AI Persona", ("COO", "CEO")),
+    ]),
+}
+
+
+def _widget(at, kind, label):
+    widgets = [w for w in getattr(at, kind) if w.label == label]
+    if not widgets:
+        raise LookupError(f"no {kind} labelled {label!r}")
+    return widgets[0]
+
+
+def _set(widget, kind, value):
+    if kind == "selectbox":
+        widget.select(value)
+    else:
+        widget.set_value(value)
+
+
+def measure_page(page, repeat=9, timeout=60):
+    """Return ``[(interaction, median_ms, max_ms)]`` for one page."""
+    run_button, interactions = PAGES[page]
+    at = AppTest.from_file(os.path.join(ROOT, "pages", f"{page}.py"), default_timeout=timeout).run()
+    if run_button:
+        _widget(at, "button", run_button).click().run()
+    rows = []
+    for name, kind, label, values in interactions:
+        if values is None:  # date range: toggle trimming the first day
+            lo, hi = _widget(at, kind, label).value
+            values = ((lo.replace(day=lo.day + 1), hi), (lo, hi))
+        timings = []
+        for i in range(repeat):
+            _set(_widget(at, kind, label), kind, values[i % 2])
+            start = time.perf_counter()
+            at.run()
+            timings.append((time.perf_counter() - start) * 1000)
+            if at.exception:
+                raise RuntimeError(f"{page}: {at.exception[0].value}")
+        rows.append((name, statistics.median(timings), max(timings)))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("pages", nargs="*", default=list(PAGES), help="page names (default: all)")
+    parser.add_argument("--repeat", type=int, default=9, help="reruns per interaction")
+    args = parser.parse_args(argv)
+    os.environ.setdefault("LLM_BACKEND", "stub")
+    sys.path.insert(0, ROOT)
+
+    print(f"{'page':<22}{'interaction':<22}{'median ms':>10}{'max ms':>10}")
+    for page in args.pages:
+        for name, median, worst in measure_page(page, args.repeat):
+            print(f"{page:<22}{name:<22}{median:>10.1f}{worst:>10.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+"""Behaviour checks for streamed persona reviews on the stub backend.
+
+    python -m benchmarks.stream_check
+
+Runs ``LLMGateway.stream`` against ``StubBackend(first_token_delay=...,
+chunk_delay=...)`` with an in-memory cache and checks that:
+
+* chunks arrive one by one, the first after about ``first_token_delay``;
+* a complete stream is cached and the next identical call is a hit;
+* setting the ``cancel`` event, or closing the generator early (what
+  Streamlit does when a rerun interrupts ``st.write_stream``), stops the
+  backend stream, marks the call cancelled and caches nothing.
+
+Exits 1 on the first failed check. No network or API key is needed.
+"""
+import os
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from core.llm import LLMGateway, MemoryLRU, ResponseCache, StubBackend  # noqa: E402
+
+FIRST_TOKEN_DELAY = 0.05
+CHUNK_DELAY = 0.005
+SYSTEM = "You are the CFO."
+
+
+def _gateway():
+    backend = StubBackend(first_token_delay=FIRST_TOKEN_DELAY, chunk_delay=CHUNK_DELAY)
+    return LLMGateway(backend, ResponseCache(MemoryLRU())), backend
+
+
+def _check(ok, message):
+    if not ok:
+        raise AssertionError(message)
+    print(f"ok   {message}")
+
+
+def check_streams_chunks():
+    gateway, backend = _gateway()
+    stats = []
+    start = time.perf_counter()
+    arrivals = []
+    for _ in gateway.stream(SYSTEM, "Review deal A.", on_stats=stats.append):
+        arrivals.append(time.perf_counter() - start)
+    _check(len(arrivals) > 5, f"stream yields many chunks ({len(arrivals)})")
+    _check(arrivals[0] >= FIRST_TOKEN_DELAY, f"first chunk waits for the first token ({arrivals[0]:.3f}s)")
+    _check(arrivals[-1] - arrivals[0] >= CHUNK_DELAY * (len(arrivals) - 1) * 0.9,
+           "later chunks arrive incrementally, not all at once")
+    s = stats[0]
+    _check(not s.cached and not s.cancelled and s.ttft is not None and s.ttft <= s.total,
+           f"stats record a complete uncached call (ttft {s.ttft:.3f}s, total {s.total:.3f}s)")
+
+    stats.clear()
+    text = "".join(gateway.stream(SYSTEM, "Review deal A.", on_stats=stats.append))
+    _check(stats[0].cached and backend.calls == 1, "a complete stream is cached; the repeat is a hit")
+    _check(text.startswith("[stub"), "the cache hit yields the full text")
+
+
+def check_cancel_event():
+    gateway, backend = _gateway()
+    cancel = threading.Event()
+    stats = []
+    received = []
+    for piece in gateway.stream(SYSTEM, "Review deal B.", cancel=cancel, on_stats=stats.append):
+        received.append(piece)
+        if len(received) == 3:
+            cancel.set()
+    _check(len(received) == 3, "setting the cancel event stops the stream")
+    _check(stats[0].cancelled, "the cancelled call is recorded as cancelled")
+    list(gateway.stream(SYSTEM, "Review deal B."))
+    _check(backend.calls == 2, "a cancelled (partial) stream is not cached")
+
+
+def check_close_generator():
+    gateway, backend = _gateway()
+    stats = []
+    chunks = gateway.stream(SYSTEM, "Review deal C.", on_stats=stats.append)
+    next(chunks)
+    next(chunks)
+    chunks.close()
+    _check(stats and stats[0].cancelled and stats[0].error is None,
+           "closing the generator early ends the call as cancelled")
+    list(gateway.stream(SYSTEM, "Review deal C."))
+    _check(backend.calls == 2, "a stream closed early is not cached")
+
+
+def main():
+    checks = [check_streams_chunks, check_cancel_event, check_close_generator]
+    try:
+        for check in checks:
+            check()
+    except AssertionError as e:
+        print(f"FAIL {e}", file=sys.stderr)
+        return 1
+    print(f"{len(checks)} stream checks passed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,290 @@
+"""Headless benchmarks for every engine and the persona-review path.
+
+    python -m benchmarks.suite                     # run, compare with baseline.json
+    python -m benchmarks.suite --save              # run and overwrite the baseline
+    python -m benchmarks.suite -k deal --max-scale 100000
+
+Each case is timed ``--repeat`` times after one warm-up call (best time
+kept), then run once more under ``tracemalloc`` for its peak Python/NumPy
+allocation. Results are keyed ``"<case>[<scale>]"`` with wall seconds, peak
+MiB and throughput (scale units per second). A case regresses when it is
+more than ``--threshold`` slower (and at least ``MIN_DELTA_S`` slower) or
+uses more than ``--threshold`` extra peak memory than the baseline; any
+regression makes the run exit 1. Baselines are machine-specific:
+regenerate them with ``--save`` on the hardware that runs the comparison.
+
+No network or API key is needed: LLM cases use the stub backend.
+"""
+import argparse
+from dataclasses import dataclass, replace
+import datetime
+import itertools
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from core import tracing  # noqa: E402
+from core.engine import associate, cxo, deal_partner, finance, management, operating_partner, vp  # noqa: E402
+from core.llm import LLMGateway, SummaryBuilder, StubBackend, run_panel, table_deltas  # noqa: E402
+from core.store import ResultStore  # noqa: E402
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+MIN_DELTA_S = 0.002  # ignore sub-2ms swings on tiny cases
+SEED = 7
+
+
+@dataclass(frozen=True)
+class Case:
+    name: str
+    scale: int
+    unit: str
+    factory: object  # scale -> zero-argument callable to time
+
+    @property
+    def key(self):
+        return f"{self.name}[{self.scale}]"
+
+
+CASES = []
+
+
+def case(name, scales, unit):
+    """Register ``factory(scale)`` (which does the setup and returns the
+    callable to time) once per scale."""
+    def register(factory):
+        for scale in scales:
+            CASES.append(Case(name, scale, unit, factory))
+        return factory
+    return register
+
+
+# --- Engines -----------------------------------------------------------------
+
+@case("deal_partner.simulate", (1_000, 100_000, 1_000_000), "paths")
+def _deal(n):
+    params = deal_partner.DealParams.from_preset("Base")
+    return lambda: deal_partner.simulate(params, n, seed=SEED).summary()
+
+
+@case("deal_partner.update_multiple", (1_000, 100_000, 1_000_000), "paths")
+def _deal_update(n):
+    params = deal_partner.DealParams.from_preset("Base")
+    sim = deal_partner.DealSimulation(n, seed=SEED)
+    sim.update(params)
+    levers = itertools.cycle([10, 9])
+    return lambda: sim.update(replace(params, exit_multiple=next(levers))).summary()
+
+
+@case("deal_partner.run_many", (100, 1_000), "scenarios")
+def _deal_many(n):
+    batch = [({"growth": i % 20, "macro_shock": deal_partner.MACROS[i % 4]}, 200, i) for i in range(n)]
+    return lambda: deal_partner.run_many(batch)
+
+
+@case("finance.irr", (1_000, 100_000, 1_000_000), "cashflows")
+def _irr(n):
+    rng = np.random.default_rng(SEED)
+    cf = np.column_stack([np.full(n, -100.0), rng.normal(10, 3, (n, 4)), rng.normal(150, 40, n)])
+    return lambda: finance.irr(cf)
+
+
+@case("vp.simulate", (1_000, 100_000, 1_000_000), "paths")
+def _vp(n):
+    params = vp.VPParams(macro="Severe Recession")
+    return lambda: vp.simulate(params, n, seed=SEED).summary()
+
+
+@case("operating_partner.kpi_bands", (1_000, 100_000, 1_000_000), "paths")
+def _op_bands(n):
+    future, _ = operating_partner.project_kpis(
+        operating_partner.BASELINE, operating_partner.OPParams(pricing=8, market_shock="Mild Recession"))
+    return lambda: operating_partner.kpi_bands(future, "EBITDA", "Mild Recession", n, seed=SEED).summary()
+
+
+def _companies(n):
+    rng = np.random.default_rng(SEED)
+    names = ["Target"] + [f"Co{i}" for i in range(n - 1)]
+    fin = pd.DataFrame({"Company": names, "Revenue": rng.integers(50, 400, n),
+                        "EBITDA": rng.integers(5, 120, n), "Employees": rng.integers(50, 5000, n)})
+    comps = pd.DataFrame({"Company": names, "EBITDA_Multiple": rng.normal(9, 1.5, n).round(1),
+                          "RevenueGrowth": rng.integers(0, 20, n)})
+    return fin, comps
+
+
+@case("associate.pack", (5, 5_000), "companies")
+def _associate_pack(n):
+    fin, comps = _companies(n)
+
+    def pack():
+        clean, _ = associate.clean_financials(fin)
+        cur = associate.curate_comps(comps, comps["Company"].iloc[1:])
+        tables = [associate.sensitivity(v, "Revenue") for v in clean["Revenue"]]
+        return associate.benchmark(cur, "EBITDA_Multiple", 10_000, seed=SEED).summary(), len(tables)
+    return pack
+
+
+@case("cxo.allocation_sweep", (10, 1_000), "allocations")
+def _cxo(n):
+    rng = np.random.default_rng(SEED)
+    budgets = cxo.FUNCTIONS["Current_Budget"]
+    allocs = [dict(zip(budgets.index, (budgets * rng.uniform(0.5, 1.5, len(budgets))).round(-1)))
+              for _ in range(n)]
+    return lambda: [cxo.simulate(cxo.CxOParams(alloc=a, macro="Mild Recession")) for a in allocs]
+
+
+@case("management.apply_initiatives", (10, 10_000), "initiatives")
+def _mgmt(n):
+    rng = np.random.default_rng(SEED)
+    kpi_df = management.base_kpis("2024-01-01", periods=365)
+    days = pd.date_range("2024-01-01", periods=365).strftime("%Y-%m-%d")
+    kpis = rng.choice(management.KPIS, n)
+    inits = [{"Name": f"Init {i}", "KPI": k, "Impact": float(rng.normal(1, 0.5)),
+              "Day": days[rng.integers(0, 365)], "Complete": bool(rng.random() < 0.7)}
+             for i, k in enumerate(kpis)]
+    return lambda: management.apply_initiatives(kpi_df, inits)
+
+
+# --- Persona review path (stub backend) --------------------------------------
+
+@case("llm.summary", (5, 5_000), "rows")
+def _summary(n):
+    rng = np.random.default_rng(SEED)
+    frame = pd.DataFrame({"Current": rng.normal(100, 20, n), "Target": rng.normal(110, 20, n),
+                          "Simulated": rng.normal(105, 25, n)}, index=[f"KPI {i}" for i in range(n)])
+    return lambda: SummaryBuilder().add("Scenario: benchmark").add_rows(
+        "KPI dashboard:", table_deltas(frame)).build()
+
+
+@case("llm.panel", (3, 30), "reviews")
+def _panel(n):
+    gateway = LLMGateway(StubBackend())  # no response cache: every call reaches the backend
+    reviews = {f"Persona {i}": (f"You are reviewer {i}.", f"Review scenario {i}.") for i in range(n)}
+    return lambda: run_panel(gateway, reviews)
+
+
+# --- Instrumentation -----------------------------------------------------------
+
+@case("tracing.disabled", (100_000,), "spans")
+def _tracing_off(n):
+    tracing.disable()
+    noop = tracing.traced("noop")(lambda: None)
+
+    def spans():
+        for _ in range(n):
+            with tracing.span("x"):
+                noop()
+    return spans
+
+
+# --- Result store ------------------------------------------------------------
+
+@case("store.put", (1_000, 1_000_000), "paths")
+def _store(n):
+    result = deal_partner.simulate(deal_partner.DealParams.from_preset("Base"), n, seed=SEED)
+    arrays = {"irr": result.irr, "moic": result.moic, "exit_value": result.exit_value}
+
+    def put():
+        store = ResultStore(max_bytes=64 * 2**20)
+        return store.get(store.put(arrays))
+    return put
+
+
+# --- Runner ------------------------------------------------------------------
+
+def measure(c, repeat=3):
+    fn = c.factory(c.scale)
+    fn()  # warm-up: imports, allocator, lazy caches
+    wall = min(_timed(fn) for _ in range(repeat))
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"wall_s": wall, "peak_mib": peak / 2**20, "throughput": c.scale / wall, "unit": c.unit}
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def compare(results, baseline, threshold):
+    """Regression messages for results worse than ``baseline`` by more than ``threshold``."""
+    failures = []
+    for key, r in results.items():
+        base = baseline.get(key)
+        if base is None:
+            continue
+        if r["wall_s"] > base["wall_s"] * (1 + threshold) and r["wall_s"] - base["wall_s"] > MIN_DELTA_S:
+            failures.append(f"{key}: {r['wall_s']:.4f}s vs baseline {base['wall_s']:.4f}s")
+        if r["peak_mib"] > base["peak_mib"] * (1 + threshold) and r["peak_mib"] - base["peak_mib"] > 1:
+            failures.append(f"{key}: peak {r['peak_mib']:.1f} MiB vs baseline {base['peak_mib']:.1f} MiB")
+    return failures
+
+
+def _meta():
+    return {"python": platform.python_version(), "numpy": np.__version__, "pandas": pd.__version__,
+            "machine": platform.machine(), "cpus": os.cpu_count(),
+            "created": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds")}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("-k", "--filter", default="", help="only cases whose name contains this")
+    parser.add_argument("--max-scale", type=int, default=None, help="skip larger scales")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per case (best kept)")
+    parser.add_argument("--baseline", default=BASELINE, help="baseline JSON to compare with / save to")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown, e.g. 0.25 = 25%%")
+    parser.add_argument("--save", action="store_true", help="write results as the new baseline")
+    parser.add_argument("-o", "--output", help="also write this run's results to a JSON file")
+    args = parser.parse_args(argv)
+    os.environ.setdefault("LLM_BACKEND", "stub")
+
+    cases = [c for c in CASES if args.filter in c.name
+             and (args.max_scale is None or c.scale <= args.max_scale)]
+    results = {}
+    print(f"{'case':<44}{'wall s':>10}{'peak MiB':>10}{'throughput':>16}")
+    for c in cases:
+        r = results[c.key] = measure(c, args.repeat)
+        print(f"{c.key:<44}{r['wall_s']:>10.4f}{r['peak_mib']:>10.1f}{r['throughput']:>12,.0f} {c.unit}/s")
+
+    report = {"meta": _meta(), "results": results}
+    if args.output:
+        _write(args.output, report)
+    if args.save:
+        if os.path.exists(args.baseline):  # keep baselines of cases not run this time
+            with open(args.baseline, encoding="utf-8") as fh:
+                report["results"] = {**json.load(fh)["results"], **results}
+        _write(args.baseline, report)
+        print(f"baseline saved to {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"no baseline at {args.baseline}; run with --save to create one")
+        return 0
+    with open(args.baseline, encoding="utf-8") as fh:
+        failures = compare(results, json.load(fh)["results"], args.threshold)
+    for msg in failures:
+        print(f"REGRESSION {msg}")
+    print(f"{len(failures)} regression(s) beyond {args.threshold:.0%}" if failures else "no regressions")
+    return 1 if failures else 0
+
+
+def _write(path, report):
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump(report, fh, indent=2, sort_keys=True)
+        fh.write("\n")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
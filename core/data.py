@@ -0,0 +1,153 @@
+"""Typed, cached access to the CSVs in ``data/``.
+
+``load(name)`` reads ``data/<name>.csv`` with the explicit dtypes in
+``SCHEMAS`` and returns a DataFrame that is shared process-wide, so reruns
+and concurrent sessions do not re-parse it. A file is only re-read when its
+mtime or size changes. Parsed frames are also written once to Parquet under
+``DATA_CACHE_DIR``, named by a hash of the CSV contents and schema; a new
+process (or a touched but unchanged file) then memory-maps the Parquet copy
+instead of parsing the CSV.
+
+Frames returned by ``load`` are shared: treat them as read-only.
+"""
+from dataclasses import dataclass, field
+import glob
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+import pandas as pd
+import pyarrow  # noqa: F401  (Parquet copies and the CSV parser engine)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.getenv("DATA_DIR", os.path.join(ROOT, "data"))
+CACHE_DIR = os.getenv("DATA_CACHE_DIR", os.path.join(ROOT, ".cache", "data"))
+
+
+class SchemaError(ValueError):
+    """A data file does not have the columns or types its schema expects."""
+
+
+@dataclass(frozen=True)
+class Schema:
+    columns: dict  # column -> dtype; "datetime64[ns]" columns are parsed as ISO dates
+    index: str = None
+    dates: tuple = field(init=False, default=())
+
+    def __post_init__(self):
+        object.__setattr__(self, "dates", tuple(
+            c for c, dtype in self.columns.items() if str(dtype).startswith("datetime64")))
+
+    def fingerprint(self):
+        return json.dumps({"columns": self.columns, "index": self.index}, sort_keys=True)
+
+
+SCHEMAS = {
+    "associate_comps": Schema({"Company": "string", "EBITDA_Multiple": "float64", "RevenueGrowth": "int64"}),
+    "associate_financials": Schema(
+        {"Company": "string", "Revenue": "int64", "EBITDA": "int64", "Employees": "int64"}),
+    "associate_market_trends": Schema({"Year": "int64", "MarketGrowth": "float64", "AvgMargin": "float64"}),
+    "cxo_kpi": Schema({"KPI": "string", "Current": "float64", "Target": "float64"}, index="KPI"),
+    "cxo_targets": Schema({
+        "Function": "string", "Current_Budget": "int64", "Target_Budget": "int64",
+        "Current_Output": "int64", "Target_Output": "int64",
+    }, index="Function"),
+    "deal_partner_financials": Schema(
+        {"Year": "int64", "Revenue": "float64", "EBITDA": "float64", "CashFlow": "float64"}),
+    "mgmt_kpis": Schema({
+        "Date": "datetime64[ns]", "Sales": "float64", "Production": "float64", "Website_Visits": "float64",
+    }),
+    "op_kpi": Schema({
+        "Month": "datetime64[ns]", "Revenue": "float64", "EBITDA": "float64", "Churn": "float64",
+        "Target_Revenue": "float64", "Target_EBITDA": "float64", "Target_Churn": "float64",
+    }),
+    "vp_comps": Schema(
+        {"Company": "string", "EBITDA_Multiple": "float64", "Growth": "int64", "Margin": "int64"},
+        index="Company"),
+    "vp_diligence": Schema({"Finding": "string", "Type": "category", "Effect": "float64"}),
+}
+
+_frames = {}  # csv path -> (mtime_ns, size, frame)
+_lock = threading.Lock()
+
+
+def _stamp(path):
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def load(name, data_dir=None):
+    """``data/<name>.csv`` as a typed DataFrame, cached until the file changes."""
+    if name not in SCHEMAS:
+        raise KeyError(f"No schema for data file {name!r}; known: {sorted(SCHEMAS)}")
+    path = os.path.join(data_dir or DATA_DIR, f"{name}.csv")
+    stamp = _stamp(path)
+    with _lock:
+        cached = _frames.get(path)
+    if cached is not None and cached[:2] == stamp:
+        return cached[2]
+    frame = _load_file(path, SCHEMAS[name])
+    with _lock:
+        _frames[path] = (*stamp, frame)
+    return frame
+
+
+def clear():
+    """Forget every cached frame (Parquet copies on disk are kept)."""
+    with _lock:
+        _frames.clear()
+
+
+def _load_file(path, schema):
+    stem = os.path.basename(path)[:-4]
+    parquet = os.path.join(CACHE_DIR, f"{stem}-{_content_hash(path, schema)}.parquet")
+    if os.path.exists(parquet):
+        return _finish(pd.read_parquet(parquet, memory_map=True), schema)
+    frame = _read_csv(path, schema)
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=CACHE_DIR, suffix=".tmp")
+    os.close(fd)
+    try:
+        frame.to_parquet(tmp)
+        os.replace(tmp, parquet)
+    except BaseException:
+        os.remove(tmp)
+        raise
+    # Copies for earlier versions of the CSV (or schema) are never read again
+    for stale in glob.glob(os.path.join(CACHE_DIR, f"{glob.escape(stem)}-{'[0-9a-f]' * 16}.parquet")):
+        if stale != parquet:
+            try:
+                os.remove(stale)
+            except OSError:
+                pass
+    return _finish(frame, schema)
+
+
+def _content_hash(path, schema):
+    digest = hashlib.sha256(schema.fingerprint().encode("utf-8"))
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()[:16]
+
+
+def _read_csv(path, schema):
+    header = list(pd.read_csv(path, nrows=0).columns)
+    missing = [c for c in schema.columns if c not in header]
+    extra = [c for c in header if c not in schema.columns]
+    if missing or extra:
+        raise SchemaError(f"{path}: missing columns {missing}, unexpected columns {extra}")
+    dtypes = {c: ("string" if c in schema.dates else t) for c, t in schema.columns.items()}
+    try:
+        frame = pd.read_csv(path, dtype=dtypes, engine="pyarrow")
+        for col in schema.dates:
+            frame[col] = pd.to_datetime(frame[col], format="ISO8601").astype(schema.columns[col])
+    except (ValueError, TypeError) as e:
+        raise SchemaError(f"{path}: {e}") from e
+    return frame[list(schema.columns)]
+
+
+def _finish(frame, schema):
+    return frame.set_index(schema.index) if schema.index else frame
@@ -0,0 +1,29 @@
+"""Headless simulation engines for every role page.
+
+Pure functions and dataclasses with explicit parameters and seeds, so the
+models can be imported, batch-run (``python -m core.engine.cli``),
+benchmarked and parallelized without Streamlit. Each module exposes
+``run(params, n_runs, seed) -> dict`` for batch use.
+
+Submodules are imported on first access, so a page importing
+``core.engine.deal_partner`` does not also load pandas for the others.
+"""
+import importlib
+
+_MODULES = ("deal_partner", "vp", "associate", "operating_partner", "cxo", "management")
+
+__all__ = ["ENGINES", *sorted(_MODULES)]
+
+
+def __getattr__(name):
+    if name in _MODULES:
+        return importlib.import_module(f"{__name__}.{name}")
+    if name == "ENGINES":
+        engines = {m: importlib.import_module(f"{__name__}.{m}").run for m in _MODULES}
+        globals()["ENGINES"] = engines
+        return engines
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted({*globals(), *__all__})
@@ -0,0 +1,70 @@
+"""Associate: data pack cleaning, sensitivity table and comps benchmarking."""
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from core.engine.finance import percentiles
+
+FINANCIALS = pd.DataFrame({
+    "Company": ["Target", "Alpha", "Beta", "Gamma", "Outlier"],
+    "Revenue": [120, 130, 115, 140, 300],
+    "EBITDA": [25, 23, 22, 30, 100],
+    "Employees": [200, 220, 210, 230, 250]
+})
+
+COMPS = pd.DataFrame({
+    "Company": ["Alpha", "Beta", "Gamma", "Target"],
+    "EBITDA_Multiple": [9, 8, 11, 8.5],
+    "RevenueGrowth": [10, 9, 12, 8]
+})
+
+OUTLIER_REVENUE = 250
+
+
+def clean_financials(fin, max_revenue=OUTLIER_REVENUE):
+    """Drop outliers (revenue at or above ``max_revenue``); returns (clean, n_removed)."""
+    clean = fin[fin["Revenue"] < max_revenue]
+    return clean, fin.shape[0] - clean.shape[0]
+
+
+def sensitivity(base_val, metric, pct=10):
+    """-pct / base / +pct table for one metric."""
+    return pd.DataFrame({
+        "Scenario": [f"-{pct}%", "Base", f"+{pct}%"],
+        metric: [round(base_val * (1 - pct / 100), 1), base_val, round(base_val * (1 + pct / 100), 1)]
+    })
+
+
+def curate_comps(comps, selected):
+    """Selected comps plus the target, indexed by company."""
+    return comps[comps["Company"].isin(list(selected) + ["Target"])].set_index("Company")
+
+
+@dataclass
+class BenchmarkResult:
+    samples: np.ndarray
+    target: float
+
+    def summary(self):
+        p25, p50, p75 = percentiles(self.samples)
+        return {"p25": p25, "p50": p50, "p75": p75, "target": self.target}
+
+
+def benchmark(cur_comps, kpi, n_runs=500, seed=None):
+    """Monte Carlo of the comps' ``kpi`` (normal fit) against the target's value."""
+    rng = np.random.default_rng(seed)
+    comps_vals = cur_comps.drop("Target")[kpi]
+    samples = rng.normal(comps_vals.mean(), comps_vals.std(), int(n_runs))
+    return BenchmarkResult(samples, float(cur_comps.loc["Target", kpi]))
+
+
+def run(params=None, n_runs=500, seed=None):
+    """Batch entry point. ``params``: ``kpi`` and optional ``comps`` (names)."""
+    params = dict(params or {})
+    kpi = params.get("kpi", "EBITDA_Multiple")
+    selected = params.get("comps", ["Alpha", "Beta", "Gamma"])
+    if isinstance(selected, str):
+        selected = [c.strip() for c in selected.split(",") if c.strip()]
+    result = benchmark(curate_comps(COMPS, selected), kpi, n_runs, seed)
+    return {"kpi": kpi, "comps": ",".join(selected), **result.summary()}
@@ -0,0 +1,101 @@
+"""CxO: budget reallocation across functions and its KPI impact."""
+from dataclasses import dataclass, field
+
+import pandas as pd
+
+MACROS = ["Normal", "Mild Recession", "Severe Recession"]
+
+KPI_BASELINE = pd.DataFrame({
+    "KPI": ["Revenue", "EBITDA", "NPS", "Churn", "Cash Conversion"],
+    "Current": [12.5, 3.1, 65, 6.5, 74],
+    "Target": [15, 3.8, 72, 5, 82]
+}).set_index("KPI")
+
+FUNCTIONS = pd.DataFrame({
+    "Function": ["Sales", "Marketing", "Product", "Ops", "Service"],
+    "Current_Budget": [500, 300, 200, 180, 120],
+    "Target_Budget": [600, 340, 250, 220, 150],
+    "Current_Output": [80, 40, 30, 35, 33],
+    "Target_Output": [100, 60, 50, 50, 44]
+}).set_index("Function")
+
+
+@dataclass(frozen=True)
+class CxOParams:
+    alloc: dict = field(default_factory=dict)  # function -> budget; missing = current budget
+    macro: str = "Normal"
+    cost_control: bool = True
+    incremental_invest: bool = False
+
+
+@dataclass
+class CxOResult:
+    sim_out: dict
+    kpi_impact: pd.Series
+    dashboard: pd.DataFrame
+    functions: pd.DataFrame
+    over_budget: bool
+
+
+def functional_output(func_df, alloc):
+    """Projected output per function: linear towards target with budget, capped at 125%."""
+    scale = (pd.Series(alloc, dtype=float).reindex(func_df.index) / func_df["Current_Budget"]).where(
+        func_df["Current_Budget"] > 0, 0.0)
+    base, target = func_df["Current_Output"], func_df["Target_Output"]
+    out = (base + (target - base) * scale).clip(upper=target * 1.25)
+    return out.round(1).to_dict()
+
+
+def kpi_impact(kpi_df, func_df, sim_out, macro="Normal", cost_control=True, incremental_invest=False):
+    """Map functional output changes and macro/behaviour toggles onto the KPIs."""
+    delta = {f: sim_out[f] - func_df.loc[f, "Current_Output"] for f in func_df.index}
+    impact = kpi_df["Current"].astype(float)
+    impact["Revenue"] += 0.07 * (delta["Sales"] + delta["Marketing"])
+    impact["EBITDA"] += 0.04 * delta["Ops"]
+    impact["NPS"] += 0.10 * delta["Product"] + 0.04 * delta["Service"]
+    impact["Churn"] -= 0.02 * delta["Service"]
+    impact["Cash Conversion"] += 0.03 * (delta["Ops"] + delta["Product"])
+
+    # Macro/behavior effect
+    if macro == "Mild Recession":
+        impact["Revenue"] *= 0.97
+        impact["EBITDA"] *= 0.97
+        impact["Churn"] += 0.7
+    if macro == "Severe Recession":
+        impact["Revenue"] *= 0.94
+        impact["EBITDA"] *= 0.93
+        impact["Churn"] += 1.8
+    if cost_control:
+        impact["EBITDA"] *= 1.03
+        impact["Cash Conversion"] *= 1.01
+    if incremental_invest:
+        impact["Revenue"] *= 1.03
+        impact["NPS"] += 0.7
+    return impact.round(2)
+
+
+def simulate(params, kpi_df=KPI_BASELINE, func_df=FUNCTIONS):
+    alloc = {f: params.alloc.get(f, func_df.loc[f, "Current_Budget"]) for f in func_df.index}
+    sim_out = functional_output(func_df, alloc)
+    impact = kpi_impact(kpi_df, func_df, sim_out, params.macro, params.cost_control,
+                        params.incremental_invest)
+    dashboard = pd.DataFrame({"Current": kpi_df["Current"], "Target": kpi_df["Target"], "Simulated": impact})
+    functions = pd.DataFrame({"Allocated Budget": alloc, "Projected Output": sim_out,
+                              "Target Output": func_df["Target_Output"]})
+    over = sum(alloc.values()) > func_df["Current_Budget"].sum()
+    return CxOResult(sim_out, impact, dashboard, functions, over)
+
+
+def run(params=None, n_runs=None, seed=None):
+    """Batch entry point. Budgets come as ``alloc`` or ``<Function>_budget`` keys."""
+    params = dict(params or {})
+    alloc = dict(params.pop("alloc", {}) or {})
+    for f in FUNCTIONS.index:
+        if f"{f}_budget" in params:
+            alloc[f] = params.pop(f"{f}_budget")
+    result = simulate(CxOParams(alloc=alloc, **params))
+    out = {"macro": params.get("macro", "Normal"), "over_budget": result.over_budget}
+    out.update({f"{f}_budget": float(v) for f, v in result.functions["Allocated Budget"].items()})
+    out.update({f"{f}_output": v for f, v in result.sim_out.items()})
+    out.update({f"sim_{k}": float(v) for k, v in result.kpi_impact.items()})
+    return out
@@ -0,0 +1,359 @@
+"""Deal Partner: Monte Carlo IRR / MOIC / exit value with persona rules.
+
+Every path draws its own growth, margin, exit multiple, pricing power, churn
+and macro severity; management and customer behaviour rules then adjust the
+drivers before a five-year revenue/EBITDA projection and an exit at the
+drawn multiple. All paths are computed at once with NumPy.
+"""
+from collections import defaultdict
+from dataclasses import asdict, dataclass, fields, replace
+
+import numpy as np
+
+from core import tracing
+from core.engine.finance import irr, percentiles
+
+MACROS = ["None", "Expansion", "Mild Recession", "Severe Recession"]
+
+SCENARIOS = {
+    "Base": {"growth": 8, "margin": 18, "multiple": 9, "pricing": 2, "churn": 5, "macro": "None"},
+    "Upside": {"growth": 12, "margin": 21, "multiple": 10, "pricing": 4, "churn": 3, "macro": "Expansion"},
+    "Downside": {"growth": 3, "margin": 15, "multiple": 7, "pricing": 0, "churn": 8, "macro": "Mild Recession"},
+    "Custom": None,
+}
+
+# Noise around each lever (standard deviations, in lever units)
+NOISE = {"growth": 1.5, "margin": 1.2, "multiple": 0.5, "pricing": 0.5, "churn": 1.0}
+
+
+@dataclass(frozen=True)
+class DealParams:
+    growth: float = 8
+    margin: float = 18
+    exit_multiple: float = 9
+    pricing_power: float = 2
+    churn: float = 5
+    macro_shock: str = "None"
+    management_response: bool = True
+    retention_action: bool = True
+    pricing_backlash: bool = True
+    revenue0: float = 100
+    years: int = 5
+    purchase_price: float = 200
+
+    def __post_init__(self):
+        if self.macro_shock not in MACROS:
+            raise ValueError(f"Unknown macro_shock {self.macro_shock!r}; choose from {MACROS}")
+
+    @classmethod
+    def from_preset(cls, name, **overrides):
+        preset = SCENARIOS[name] or {}
+        values = {
+            "growth": preset.get("growth", 8), "margin": preset.get("margin", 18),
+            "exit_multiple": preset.get("multiple", 9), "pricing_power": preset.get("pricing", 2),
+            "churn": preset.get("churn", 5), "macro_shock": preset.get("macro", "None"),
+        }
+        values.update(overrides)
+        return cls(**values)
+
+
+@dataclass
+class DealResult:
+    irr: np.ndarray  # % per path, finite paths only
+    moic: np.ndarray
+    exit_value: np.ndarray
+    rules: list  # persona/behaviour rules that fired on at least one path
+
+    def summary(self):
+        p25, p50, p75 = percentiles(self.irr)
+        moic_p25, moic_p50, moic_p75 = percentiles(self.moic)
+        return {
+            "p25": p25, "p50": p50, "p75": p75,
+            "moic_p25": moic_p25, "moic_p50": moic_p50, "moic_p75": moic_p75,
+            "exit_value_p50": float(np.median(self.exit_value)) if self.exit_value.size else np.nan,
+            "prob_irr_20": float(np.mean(self.irr >= 20)) if self.irr.size else np.nan,
+            "n_valid": int(self.irr.size),
+        }
+
+
+def draw(n_runs, seed=None):
+    """Standard-normal and uniform draws for ``n_runs`` paths."""
+    rng = np.random.default_rng(seed)
+    n = int(n_runs)
+    draws = {name: rng.standard_normal(n) for name in NOISE}
+    for name in ("u_growth", "u_margin", "u_churn"):
+        draws[name] = rng.random(n)
+    return draws
+
+
+def churn_path(params, draws):
+    """Per-path churn (%) after the macro shock, and where the retention initiative fires."""
+    churn = params.churn + NOISE["churn"] * draws["churn"]
+    if params.macro_shock == "Severe Recession":
+        churn = churn + 2 + 2 * draws["u_churn"]
+    retention = (churn > 10) if params.retention_action else np.zeros_like(churn, dtype=bool)
+    return churn, retention
+
+
+def growth_drivers(params, draws, churn, retention):
+    """Per-path growth, pricing and churn effect (the inputs to revenue)."""
+    g = params.growth + NOISE["growth"] * draws["growth"]
+    p = params.pricing_power + NOISE["pricing"] * draws["pricing"]
+    macro = params.macro_shock
+    if macro == "Expansion":
+        g = g + 2 + 2 * draws["u_growth"]
+    elif macro == "Mild Recession":
+        g = g - (3 + 2 * draws["u_growth"])
+    elif macro == "Severe Recession":
+        g = g - (5 + 3 * draws["u_growth"])
+
+    churn_effect = 1 - churn / 100
+    churn_effect = churn_effect + 0.04 * retention
+    backlash = (p > 5) if params.pricing_backlash else np.zeros_like(p, dtype=bool)
+    churn_effect = churn_effect - 0.02 * backlash
+    return {"growth": g, "pricing": p, "churn_effect": churn_effect, "backlash": backlash}
+
+
+def margin_path(params, draws, retention):
+    """Per-path EBITDA margin (%) after macro, cost takeout and retention cost."""
+    m = params.margin + NOISE["margin"] * draws["margin"]
+    macro = params.macro_shock
+    if macro == "Expansion":
+        m = m + 0.5 + 0.5 * draws["u_margin"]
+    elif macro == "Mild Recession":
+        m = m - (1 + draws["u_margin"])
+        if params.management_response:
+            m = m + 1.0
+    elif macro == "Severe Recession":
+        m = m - (2 + 2 * draws["u_margin"])
+        if params.management_response:
+            m = m + 1.5
+    return m - 0.3 * retention
+
+
+def multiple_path(params, draws):
+    return params.exit_multiple + NOISE["multiple"] * draws["multiple"]
+
+
+def macro_rules(params):
+    """Macro and management rules that apply to every path."""
+    macro = params.macro_shock
+    if macro == "Expansion":
+        return ["Expansion: market tailwind boosts growth and margin."]
+    if macro == "Mild Recession":
+        rules = ["Mild Recession: growth and margin hit."]
+        if params.management_response:
+            rules.append("Mgmt: Cost takeout adds +1 margin in downturn.")
+        return rules
+    if macro == "Severe Recession":
+        rules = ["Severe Recession: bigger hits to growth/margin, churn rises."]
+        if params.management_response:
+            rules.append("Mgmt: Aggressive cost cutting in severe downturn.")
+        return rules
+    return []
+
+
+def drivers(params, draws):
+    """Per-path growth, margin, multiple, pricing and churn effect, plus fired rules."""
+    churn, retention = churn_path(params, draws)
+    d = growth_drivers(params, draws, churn, retention)
+    d.update(margin=margin_path(params, draws, retention), multiple=multiple_path(params, draws),
+             retention=retention)
+    return d, macro_rules(params)
+
+
+def revenue_path(params, d):
+    """Revenue for years 1..``years`` per path, shape ``(n, years)``."""
+    factor = (1 + d["growth"] / 100) * (1 + d["pricing"] / 100) * d["churn_effect"]
+    years = np.arange(1, params.years + 1)
+    return np.reshape(params.revenue0, (-1, 1)) * factor[:, None] ** years
+
+
+def exit_values(ebitda, multiple):
+    return ebitda[:, -1] * multiple
+
+
+def irr_path(params, ebitda, exit_value, guess=0.1):
+    """IRR (%) per path of buying at ``purchase_price`` and exiting after ``years``."""
+    by_period = np.empty((ebitda.shape[1] + 1, len(ebitda)))
+    by_period[0] = -params.purchase_price
+    by_period[1:] = ebitda.T
+    by_period[-1] += exit_value
+    return irr(by_period.T, guess=guess) * 100
+
+
+def moic_path(params, ebitda, exit_value):
+    return (ebitda.sum(axis=1) + exit_value) / params.purchase_price
+
+
+def outcomes(params, ebitda, multiple):
+    """Exit value, IRR (%) and MOIC per path from the EBITDA path."""
+    exit_value = exit_values(ebitda, multiple)
+    return exit_value, irr_path(params, ebitda, exit_value), moic_path(params, ebitda, exit_value)
+
+
+def evaluate(params, draws):
+    """Run the model on pre-drawn randomness."""
+    d, rules = drivers(params, draws)
+    ebitda = revenue_path(params, d) * (d["margin"] / 100)[:, None]
+    return _result(rules, d, *outcomes(params, ebitda, d["multiple"]))
+
+
+def _result(rules, d, exit_value, irr_pct, moic):
+    ok = np.isfinite(irr_pct)
+    return DealResult(irr_pct[ok], moic[ok], exit_value[ok], fired_rules(rules, d, ok))
+
+
+def fired_rules(rules, d, ok):
+    rules = list(rules) if ok.any() else []
+    if (d["retention"] & ok).any():
+        rules.append("Mgmt: Retention initiative deployed, wins back some customers (lower churn), slight margin cost.")
+    if (d["backlash"] & ok).any():
+        rules.append("Customers: Backlash to high pricing—churn ticks up.")
+    return rules
+
+
+def simulate(params, n_runs=500, seed=None):
+    return evaluate(params, draw(n_runs, seed))
+
+
+# Levers that change which branches ``drivers`` takes; scenarios can only share
+# a vectorized pass when these match. Every other field may differ per path.
+_BRANCH_FIELDS = ("macro_shock", "management_response", "retention_action", "pricing_backlash", "years")
+
+
+def simulate_many(scenarios):
+    """``simulate`` for many ``(params, n_runs, seed)`` scenarios in one pass.
+
+    Scenarios with the same branch levers are stacked into a single set of
+    paths, with the numeric levers repeated per path, so the IRR solve runs
+    once over all of them instead of once per scenario. Each result uses the
+    same draws as ``simulate(params, n_runs, seed)`` and matches it to within
+    the IRR solver tolerance.
+    """
+    groups = defaultdict(list)
+    for i, (params, _, _) in enumerate(scenarios):
+        groups[tuple(getattr(params, f) for f in _BRANCH_FIELDS)].append(i)
+    numeric = [f.name for f in fields(DealParams) if f.name not in _BRANCH_FIELDS]
+    results = [None] * len(scenarios)
+    for idx in groups.values():
+        draws = [draw(scenarios[i][1], scenarios[i][2]) for i in idx]
+        sizes = [len(d["growth"]) for d in draws]
+        stacked = replace(scenarios[idx[0]][0], **{
+            f: np.repeat([float(getattr(scenarios[i][0], f)) for i in idx], sizes) for f in numeric})
+        d, rules = drivers(stacked, {k: np.concatenate([dr[k] for dr in draws]) for k in draws[0]})
+        ebitda = revenue_path(stacked, d) * (d["margin"] / 100)[:, None]
+        exit_value, irr_pct, moic = outcomes(stacked, ebitda, d["multiple"])
+        bounds = np.cumsum([0, *sizes])
+        for i, lo, hi in zip(idx, bounds[:-1], bounds[1:]):
+            part = {k: v[lo:hi] for k, v in d.items()}
+            results[i] = _result(rules, part, exit_value[lo:hi], irr_pct[lo:hi], moic[lo:hi])
+    return results
+
+
+# Stage -> (levers it reads, stages it reads), in dependency order. Each stage
+# is one step of the model above; see DealSimulation.
+STAGES = {
+    "churn": ({"churn", "macro_shock", "retention_action"}, ()),
+    "growth": ({"growth", "pricing_power", "macro_shock", "pricing_backlash"}, ("churn",)),
+    "margin": ({"margin", "macro_shock", "management_response"}, ("churn",)),
+    "multiple": ({"exit_multiple"}, ()),
+    "revenue": ({"revenue0", "years"}, ("growth",)),
+    "ebitda": (set(), ("revenue", "margin")),
+    "exit_value": (set(), ("ebitda", "multiple")),
+    "irr": ({"purchase_price"}, ("ebitda", "exit_value")),
+    "moic": ({"purchase_price"}, ("ebitda", "exit_value")),
+}
+
+
+class DealSimulation:
+    """One set of Deal Partner paths, kept live while the levers move.
+
+    The draws are made once. ``update(params)`` recomputes only the stages
+    in ``STAGES`` that read a changed lever, plus the stages downstream of
+    them, and reuses every other stage array. For example, changing the exit
+    multiple recomputes exit value, IRR and MOIC, but not revenue or EBITDA.
+    The IRR solve starts from the previous IRRs, so it converges in a few
+    steps. Every update uses the same draws, so before/after differences
+    come from the levers, not from resampling. Results match
+    ``simulate(params, n_runs, seed)`` to within the IRR tolerance.
+    """
+
+    def __init__(self, n_runs=500, seed=None):
+        self.draws = draw(n_runs, seed)
+        self.params = None
+        self.stages = {}
+        self.recomputed = ()  # stages the last update recomputed
+
+    def update(self, params):
+        """Move to ``params`` and return the new ``DealResult``."""
+        if self.params is None:
+            changed = {f.name for f in fields(DealParams)}
+        else:
+            changed = {f.name for f in fields(DealParams) if getattr(params, f.name) != getattr(self.params, f.name)}
+        stale = []
+        for name, (levers, inputs) in STAGES.items():
+            if name not in self.stages or levers & changed or any(i in stale for i in inputs):
+                stale.append(name)
+        self.params = params
+        for name in stale:
+            with tracing.span(f"stage.{name}"):
+                self.stages[name] = self._compute(name)
+        self.recomputed = tuple(stale)
+        return self.result()
+
+    def _compute(self, name):
+        p, dr, s = self.params, self.draws, self.stages
+        if name == "churn":
+            return churn_path(p, dr)
+        if name == "growth":
+            return growth_drivers(p, dr, *s["churn"])
+        if name == "margin":
+            return margin_path(p, dr, s["churn"][1])
+        if name == "multiple":
+            return multiple_path(p, dr)
+        if name == "revenue":
+            return revenue_path(p, s["growth"])
+        if name == "ebitda":
+            return s["revenue"] * (s["margin"] / 100)[:, None]
+        if name == "exit_value":
+            return exit_values(s["ebitda"], s["multiple"])
+        if name == "irr":
+            previous = s.get("irr")
+            guess = 0.1 if previous is None else np.where(np.isfinite(previous), previous / 100, 0.1)
+            return irr_path(p, s["ebitda"], s["exit_value"], guess)
+        if name == "moic":
+            return moic_path(p, s["ebitda"], s["exit_value"])
+        raise KeyError(name)
+
+    @property
+    def nbytes(self):
+        """Memory held by the draws and stage arrays."""
+        def size(value):
+            if isinstance(value, np.ndarray):
+                return value.nbytes
+            if isinstance(value, dict):
+                return sum(size(v) for v in value.values())
+            if isinstance(value, (tuple, list)):
+                return sum(size(v) for v in value)
+            return 0
+        return size(self.draws) + size(self.stages)
+
+    def result(self):
+        s = self.stages
+        d = {"retention": s["churn"][1], "backlash": s["growth"]["backlash"]}
+        return _result(macro_rules(self.params), d, s["exit_value"], s["irr"], s["moic"])
+
+
+def run(params=None, n_runs=500, seed=None):
+    """Batch entry point: flat dict of inputs and summary metrics."""
+    params = params if isinstance(params, DealParams) else DealParams(**(params or {}))
+    return {**asdict(params), **simulate(params, n_runs, seed).summary()}
+
+
+def run_many(batch):
+    """Batch entry point for many small scenarios: ``[(params, n_runs, seed)]``
+    (``params`` a dict or ``DealParams``) to rows like ``run``, computed with
+    ``simulate_many``."""
+    scenarios = [(p if isinstance(p, DealParams) else DealParams(**(p or {})), n, seed) for p, n, seed in batch]
+    return [{**asdict(p), **r.summary()} for (p, _, _), r in zip(scenarios, simulate_many(scenarios))]
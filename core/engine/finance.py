@@ -0,0 +1,104 @@
+"""Vectorized financial helpers shared by the engines."""
+import numpy as np
+
+from core.tracing import traced
+
+
+def _npv(cols, r):
+    """NPV at rate ``r`` and its derivative in ``r``, for cash flows given by
+    period (``cols[t]`` is every row's flow at ``t``).
+
+    Horner's scheme in the discount factor ``v = 1 / (1 + r)``: a few
+    in-place vector operations per period instead of a matrix power.
+    """
+    v = 1.0 / (1.0 + r)
+    npv = cols[-1].copy()
+    dv = np.zeros_like(npv)
+    for col in cols[-2::-1]:
+        dv *= v
+        dv += npv
+        npv *= v
+        npv += col
+    return npv, -(v * v) * dv
+
+
+# Starting points for rows the first Newton pass leaves unsolved, in order of preference
+FALLBACK_GUESSES = (-0.5, 1.0, -0.9, 5.0)
+
+
+def _newton(cols, r, iterations, tol):
+    """Newton iterations on every column of ``cols`` from rates ``r`` (updated in place)."""
+    n = r.size
+    active = np.arange(n)  # rows still iterating; converged rows drop out
+    for _ in range(iterations):
+        full = active.size == n
+        ra = r if full else r[active]
+        npv, d_npv = _npv(cols if full else cols[:, active], ra)
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            step = npv / d_npv
+        step[~np.isfinite(step)] = 0.0
+        if full:
+            r = np.maximum(ra - step, -0.999)
+        else:
+            r[active] = np.maximum(ra - step, -0.999)
+        keep = np.abs(step) >= tol
+        active = np.flatnonzero(keep) if full else active[keep]
+        if active.size == 0:
+            break
+    return r
+
+
+def _solved(cols, r, scale):
+    npv, _ = _npv(cols, r)
+    return (np.abs(npv) <= 1e-6 * scale) & (r > -0.999)
+
+
+@traced("irr")
+def irr(cashflows, guess=0.1, iterations=50, tol=1e-9):
+    """IRR of every row of ``cashflows`` (shape ``(n, periods + 1)``, t=0 first).
+
+    Newton's method on all rows at once. Rows it leaves unsolved (e.g. flows
+    whose NPV is not monotone in the rate) are retried from the
+    ``FALLBACK_GUESSES``. Rows with no real root above -100% are NaN, like
+    ``numpy_financial.irr``. ``guess`` may be one rate or one per row (e.g.
+    the IRRs of a nearby scenario). Returned as a fraction, not a percentage.
+    """
+    cf = np.atleast_2d(np.asarray(cashflows, dtype=float))
+    cols = np.ascontiguousarray(cf.T)  # a view when built by period, e.g. ``by_period.T``
+    n = cf.shape[0]
+    scale = np.abs(cf).sum(axis=1)
+    scale = np.where(scale > 0, scale, 1.0)
+    r = _newton(cols, np.array(np.broadcast_to(guess, n), dtype=float), iterations, tol)
+    ok = _solved(cols, r, scale)
+    failed = np.flatnonzero(~ok)
+    if failed.size and FALLBACK_GUESSES:
+        # One Newton pass over every (unsolved row, fallback guess) pair
+        k = len(FALLBACK_GUESSES)
+        rows = np.repeat(failed, k)
+        sub = cols[:, rows]
+        retry = _newton(sub, np.tile(FALLBACK_GUESSES, failed.size), iterations, tol)
+        fixed = _solved(sub, retry, scale[rows]).reshape(-1, k)
+        first = fixed.argmax(axis=1)  # earliest guess in FALLBACK_GUESSES that converged
+        found = fixed.any(axis=1)
+        r[failed[found]] = retry.reshape(-1, k)[found, first[found]]
+        ok[failed[found]] = True
+    return np.where(ok, r, np.nan)
+
+
+@traced("percentiles")
+def percentiles(values, qs=(25, 50, 75)):
+    """Percentiles of the finite entries of ``values`` (NaN if there are none)."""
+    values = np.asarray(values, dtype=float)
+    values = values[np.isfinite(values)]
+    if values.size == 0:
+        return tuple(np.nan for _ in qs)
+    return tuple(float(v) for v in np.percentile(values, qs))
+
+
+@traced("histogram")
+def histogram(values, bins=30):
+    """``(counts, edges)`` of the finite entries of ``values``, binned once so
+    charts can be drawn from ``bins`` numbers instead of every path."""
+    values = np.asarray(values, dtype=float)
+    counts, edges = np.histogram(values[np.isfinite(values)], bins=bins)
+    return counts, edges
@@ -0,0 +1,61 @@
+"""Management Team: initiative impact on time-series KPIs."""
+import numpy as np
+import pandas as pd
+
+KPIS = ["Sales", "Production", "Website_Visits", "NPS", "Churn", "Margin"]
+
+INITIATIVES = [
+    {"Name": "Launch Product A", "KPI": "Sales", "Impact": 6, "Day": "2024-07-06", "Complete": False},
+    {"Name": "Cost Program", "KPI": "Margin", "Impact": 1, "Day": "2024-07-08", "Complete": False},
+    {"Name": "Website Campaign", "KPI": "Website_Visits", "Impact": 80, "Day": "2024-07-07", "Complete": False}
+]
+
+
+def base_kpis(start="2024-07-01", periods=10):
+    """Linear KPI trajectories from ``start`` over ``periods`` days."""
+    return pd.DataFrame({
+        "Date": pd.date_range(start, periods=periods),
+        "Sales": np.linspace(100, 120, periods),
+        "Production": np.linspace(200, 225, periods),
+        "Website_Visits": np.linspace(1500, 1750, periods),
+        "NPS": np.linspace(55, 65, periods),
+        "Churn": np.linspace(8, 6, periods),
+        "Margin": np.linspace(17, 20, periods)
+    })
+
+
+def apply_initiatives(kpi_df, initiatives):
+    """Add each completed initiative's impact to its KPI from its effective day on.
+
+    Churn initiatives always reduce churn. Impacts are accumulated as step
+    functions per KPI (one ``searchsorted`` + ``cumsum``), so the cost grows
+    with rows + initiatives rather than rows x initiatives.
+    Returns (simulated frame, applied descriptions).
+    """
+    kpi_sim = kpi_df.copy()
+    dates = kpi_sim["Date"].to_numpy()
+    steps = {}
+    applied = []
+    for init in initiatives:
+        if not init["Complete"]:
+            continue
+        kpi = init["KPI"]
+        impact = -abs(init["Impact"]) if kpi == "Churn" else init["Impact"]
+        pos = np.searchsorted(dates, np.datetime64(pd.to_datetime(init["Day"])), side="left")
+        step = steps.setdefault(kpi, np.zeros(len(dates) + 1))
+        step[pos] += impact
+        applied.append(f"{init['Name']} ({kpi} +{init['Impact']}) on {init['Day']}")
+    for kpi, step in steps.items():
+        kpi_sim[kpi] = kpi_sim[kpi] + np.cumsum(step[:-1])
+    return kpi_sim, applied
+
+
+def run(params=None, n_runs=None, seed=None):
+    """Batch entry point. ``params``: ``initiatives`` (list of dicts, default the
+    built-in three all completed) and ``periods``."""
+    params = dict(params or {})
+    initiatives = params.get("initiatives") or [dict(i, Complete=True) for i in INITIATIVES]
+    kpi_sim, applied = apply_initiatives(base_kpis(periods=int(params.get("periods", 10))), initiatives)
+    last = kpi_sim.iloc[-1]
+    return {"n_initiatives": len(initiatives), "n_applied": len(applied),
+            **{f"final_{k}": float(last[k]) for k in KPIS}}
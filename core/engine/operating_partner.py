@@ -0,0 +1,110 @@
+"""Operating Partner: value-lever KPI projection and Monte Carlo operating bands."""
+from dataclasses import asdict, dataclass
+
+import numpy as np
+import pandas as pd
+
+from core.engine.finance import percentiles
+
+KPIS = ["Revenue", "EBITDA", "Churn", "NPS", "Cash Conversion"]
+MARKETS = ["Normal", "Mild Recession", "Severe Recession"]
+
+BASELINE = pd.DataFrame({
+    "KPI": KPIS,
+    "Current": [120, 24, 7, 60, 72],
+    "Target": [140, 31, 5, 70, 80]
+}).set_index("KPI")
+
+# Band widening under stress
+MARKET_NOISE = {"Normal": 1.0, "Mild Recession": 1.3, "Severe Recession": 1.7}
+
+
+@dataclass(frozen=True)
+class OPParams:
+    pricing: float = 0
+    cost_takeout: float = 0
+    success: float = 0
+    automation: float = 0
+    wc: float = 0
+    mgmt_aggressive: bool = True
+    cx_aggressive: bool = True
+    market_shock: str = "Normal"
+
+
+def project_kpis(baseline, params):
+    """Simulated KPIs after levers, behaviours and market; returns (future, effects)."""
+    future = baseline["Current"].astype(float)
+    effects = []
+
+    # Pricing
+    future["Revenue"] *= (1 + params.pricing / 100)
+    if params.pricing > 5:
+        future["Churn"] += 0.5  # Small backlash
+        effects.append("Some churn backlash from higher pricing.")
+
+    # Cost takeout and automation
+    future["EBITDA"] *= (1 + (params.cost_takeout + params.automation) / 100)
+    if params.mgmt_aggressive and params.market_shock != "Normal":
+        future["EBITDA"] *= 1.04  # Extra bump if in stress
+
+    # Customer Success
+    future["Churn"] = max(future["Churn"] - params.success, 3)
+    if params.cx_aggressive and future["Churn"] > 8:
+        future["Churn"] = max(future["Churn"] - 1.2, 2)
+        effects.append("Customer success initiative reduced churn in stress.")
+
+    # NPS and cash conversion
+    future["NPS"] += params.automation  # Automation also helps NPS
+    future["Cash Conversion"] *= (1 + params.wc / 100)
+
+    # Macro scenarios
+    if params.market_shock == "Mild Recession":
+        future["Revenue"] *= 0.98
+        future["EBITDA"] *= 0.96
+        future["Churn"] += 0.5
+        effects.append("Revenue/EBITDA drag and churn up in mild recession.")
+    elif params.market_shock == "Severe Recession":
+        future["Revenue"] *= 0.95
+        future["EBITDA"] *= 0.90
+        future["Churn"] += 1.2
+        effects.append("Severe recession hits revenue/EBITDA, churn spikes.")
+    return future, effects
+
+
+def dashboard(baseline, future):
+    return pd.DataFrame({
+        "Current": baseline["Current"],
+        "Target": baseline["Target"],
+        "Simulated": future.round(2)
+    })
+
+
+@dataclass
+class BandResult:
+    samples: np.ndarray
+    kpi: str
+    value: float
+
+    def summary(self):
+        p25, p50, p75 = percentiles(self.samples)
+        return {"p25": p25, "p50": p50, "p75": p75, "kpi_choice": self.kpi, "kpi_val": self.value}
+
+
+def kpi_bands(future, kpi, market_shock="Normal", n_runs=500, seed=None):
+    """Monte Carlo band around one simulated KPI (2% noise, min 0.5, wider in stress)."""
+    rng = np.random.default_rng(seed)
+    value = float(future[kpi])
+    std = max(0.02 * value, 0.5) * MARKET_NOISE[market_shock]
+    return BandResult(rng.normal(value, std, int(n_runs)), kpi, value)
+
+
+def run(params=None, n_runs=500, seed=None):
+    """Batch entry point. ``params`` are ``OPParams`` fields plus optional ``kpi``."""
+    params = dict(params or {})
+    kpi = params.pop("kpi", "Revenue")
+    params = OPParams(**params)
+    future, effects = project_kpis(BASELINE, params)
+    out = {**asdict(params), **{f"sim_{k}": float(v) for k, v in future.items()},
+           "effects": "; ".join(effects)}
+    out.update(kpi_bands(future, kpi, params.market_shock, n_runs, seed).summary())
+    return out
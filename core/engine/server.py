@@ -0,0 +1,339 @@
+"""Local HTTP/JSON API over the engines, for screening scripts.
+
+    python -m core.engine.server [--host 127.0.0.1] [--port 8765] [--workers 8]
+
+Standard library only: an asyncio HTTP/1.1 server with keep-alive. The
+engines run on a thread pool. A scenario is the same mapping as in a
+``core.engine.cli`` batch (``engine``, ``n_runs``, ``seed``, ``params``, optional ``id``).
+
+``GET /health``
+    Engine names and request counters.
+``POST /run``
+    One scenario in, one result row out. Without a ``seed`` the run
+    draws fresh paths (a batch defaults each seed to the scenario's index).
+``POST /batch``
+    ``{"scenarios": [...]}`` (or a bare list) in. Newline-delimited JSON
+    comes back with chunked transfer encoding, one row per scenario, sent
+    as soon as that scenario finishes. A failing scenario becomes an
+    ``{"scenario", "error"}`` row; the stream carries on.
+
+Identical seeded scenarios that are in flight at the same time (same
+engine, params, runs and seed) share one computation. Small Deal Partner
+scenarios that arrive within ``BATCH_WINDOW_S`` of each other are stacked
+into one vectorized run (``deal_partner.run_many``).
+"""
+import argparse
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import json
+import math
+import os
+import sys
+import time
+
+from core import tracing
+from core.engine import ENGINES, deal_partner
+from core.engine.cli import parse_scenario
+
+BATCH_WINDOW_S = 0.005
+BATCH_MAX_RUNS = 1_000  # bigger scenarios are already vectorized enough on their own
+BATCH_MAX_PATHS = 200_000
+MAX_BODY = 32 * 2**20
+
+# Engines that can evaluate many scenarios in one call: [(params, n_runs, seed)] -> rows
+MICRO_BATCH = {"deal_partner": deal_partner.run_many}
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           411: "Length Required", 413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class MicroBatcher:
+    """Collects scenarios for ``window`` seconds (or until ``max_paths`` paths
+    are waiting) and evaluates them with a single call of ``fn``."""
+
+    def __init__(self, fn, executor, window=BATCH_WINDOW_S, max_paths=BATCH_MAX_PATHS):
+        self.fn = fn
+        self.executor = executor
+        self.window = window
+        self.max_paths = max_paths
+        self._pending = []
+        self._paths = 0
+        self._timer = None
+        self._tasks = set()
+        self.batches = self.items = 0
+
+    def submit(self, item):
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        self._pending.append((item, fut))
+        self._paths += item[1]
+        if self._paths >= self.max_paths:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return fut
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending, self._paths = self._pending, [], 0
+        if pending:
+            task = asyncio.get_running_loop().create_task(self._run(pending))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, pending):
+        loop = asyncio.get_running_loop()
+        items = [item for item, _ in pending]
+        self.batches += 1
+        self.items += len(items)
+        try:
+            rows = await loop.run_in_executor(self.executor, self._call, items)
+        except Exception:
+            # One bad scenario must not fail the rest of the batch
+            rows = await asyncio.gather(
+                *(loop.run_in_executor(self.executor, self._call, [item]) for item in items),
+                return_exceptions=True)
+            rows = [r if isinstance(r, BaseException) else r[0] for r in rows]
+        for (_, fut), row in zip(pending, rows):
+            if fut.done():
+                continue
+            if isinstance(row, BaseException):
+                fut.set_exception(row)
+            else:
+                fut.set_result(row)
+
+    def _call(self, items):
+        with tracing.span("api.batch", page="API", size=len(items)):
+            return self.fn(items)
+
+
+def _run_engine(engine, params, n_runs, seed):
+    with tracing.span(f"api.{engine}", page="API"):
+        return ENGINES[engine](params, n_runs=n_runs, seed=seed)
+
+
+class EngineService:
+    """Evaluates scenarios with request coalescing and micro-batching."""
+
+    def __init__(self, workers=None):
+        self.workers = workers or os.cpu_count()
+        self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="engine")
+        self.batchers = {name: MicroBatcher(fn, self.executor) for name, fn in MICRO_BATCH.items()}
+        self._inflight = {}
+        self.requests = self.coalesced = 0
+
+    async def evaluate(self, index, spec):
+        """Result row for one scenario, shaped like ``cli.run_scenario``'s."""
+        engine, n_runs, seed, params = parse_scenario(index, spec)
+        self.requests += 1
+        start = time.perf_counter()
+        if seed is None:  # fresh draws requested: nothing to share
+            out = await self._compute(engine, n_runs, seed, params)
+        else:
+            key = json.dumps([engine, n_runs, seed, params], sort_keys=True, default=str)
+            fut = self._inflight.get(key)
+            if fut is None:
+                fut = self._inflight[key] = asyncio.ensure_future(self._compute(engine, n_runs, seed, params))
+                fut.add_done_callback(lambda _: self._inflight.pop(key, None))
+            else:
+                self.coalesced += 1
+            # A client going away must not cancel a computation others are waiting on
+            out = await asyncio.shield(fut)
+        return {"scenario": spec.get("id", index), "engine": engine, "n_runs": n_runs, "seed": seed,
+                **out, "elapsed_s": time.perf_counter() - start}
+
+    async def evaluate_many(self, scenarios):
+        """Yield a row (or an error row) per scenario, in completion order."""
+        async def one(index, spec):
+            try:
+                return await self.evaluate(index, spec)
+            except Exception as e:
+                scenario = spec.get("id", index) if isinstance(spec, dict) else index
+                return {"scenario": scenario, "error": f"{type(e).__name__}: {e}"}
+
+        tasks = [asyncio.ensure_future(one(i, spec)) for i, spec in enumerate(scenarios)]
+        try:
+            for fut in asyncio.as_completed(tasks):
+                yield await fut
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _compute(self, engine, n_runs, seed, params):
+        batcher = self.batchers.get(engine)
+        if batcher is not None and n_runs <= BATCH_MAX_RUNS:
+            return await batcher.submit((params, n_runs, seed))
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, _run_engine, engine, params, n_runs, seed)
+
+    def stats(self):
+        return {"status": "ok", "engines": sorted(ENGINES), "requests": self.requests,
+                "coalesced": self.coalesced,
+                "micro_batches": {name: {"batches": b.batches, "scenarios": b.items}
+                                  for name, b in self.batchers.items()}}
+
+
+# --- HTTP ----------------------------------------------------------------------
+
+def _plain(value):
+    if hasattr(value, "item"):  # numpy scalar
+        value = value.item()
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+def _dumps(doc):
+    if isinstance(doc, dict):
+        doc = {k: _plain(v) for k, v in doc.items()}
+    return json.dumps(doc, default=str).encode("utf-8")
+
+
+async def _read_request(reader):
+    """``(method, path, headers, body)``, or ``None`` once the client has closed."""
+    line = await reader.readline()
+    if not line.strip():
+        return None
+    try:
+        method, target, version = line.decode("latin-1").split()
+    except ValueError:
+        raise HTTPError(400, "malformed request line") from None
+    headers = {"http-version": version}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    if "chunked" in headers.get("transfer-encoding", "").lower():
+        raise HTTPError(411, "send a Content-Length; chunked request bodies are not supported")
+    try:
+        length = int(headers.get("content-length") or 0)
+    except ValueError:
+        raise HTTPError(400, "Content-Length must be an integer") from None
+    if length < 0:
+        raise HTTPError(400, "Content-Length must not be negative")
+    if length > MAX_BODY:
+        raise HTTPError(413, f"request body over {MAX_BODY} bytes")
+    body = await reader.readexactly(length) if length else b""
+    return method.upper(), target.split("?", 1)[0], headers, body
+
+
+def _head(status, headers, keep_alive):
+    lines = [f"HTTP/1.1 {status} {REASONS.get(status, '')}"]
+    lines += [f"{k}: {v}" for k, v in headers.items()]
+    lines.append(f"Connection: {'keep-alive' if keep_alive else 'close'}")
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+
+async def _send_json(writer, status, doc, keep_alive):
+    body = _dumps(doc)
+    writer.write(_head(status, {"Content-Type": "application/json",
+                                "Content-Length": len(body)}, keep_alive) + body)
+    await writer.drain()
+
+
+async def _stream_ndjson(writer, rows, keep_alive):
+    writer.write(_head(200, {"Content-Type": "application/x-ndjson",
+                             "Transfer-Encoding": "chunked"}, keep_alive))
+    async for row in rows:
+        line = _dumps(row) + b"\n"
+        writer.write(b"%x\r\n%s\r\n" % (len(line), line))
+        await writer.drain()
+    writer.write(b"0\r\n\r\n")
+    await writer.drain()
+
+
+def _parse_body(body):
+    try:
+        return json.loads(body or b"null")
+    except ValueError as e:
+        raise HTTPError(400, f"invalid JSON: {e}") from None
+
+
+async def _dispatch(service, method, path, body, writer, keep_alive):
+    routes = {"/health": "GET", "/run": "POST", "/batch": "POST"}
+    if path not in routes:
+        raise HTTPError(404, f"no route {path}; try {sorted(routes)}")
+    if method != routes[path]:
+        raise HTTPError(405, f"use {routes[path]} {path}")
+    if path == "/health":
+        await _send_json(writer, 200, service.stats(), keep_alive)
+    elif path == "/run":
+        spec = _parse_body(body)
+        if not isinstance(spec, dict):
+            raise HTTPError(400, "expected one scenario object")
+        spec = {"seed": None, **spec}  # the batch default (the index) would pin every /run to seed 0
+        try:
+            row = await service.evaluate(0, spec)
+        except (KeyError, TypeError, ValueError) as e:
+            raise HTTPError(400, f"{type(e).__name__}: {e}") from None
+        await _send_json(writer, 200, row, keep_alive)
+    else:
+        doc = _parse_body(body)
+        scenarios = doc.get("scenarios") if isinstance(doc, dict) else doc
+        if not isinstance(scenarios, list):
+            raise HTTPError(400, 'expected {"scenarios": [...]} or a list of scenarios')
+        await _stream_ndjson(writer, service.evaluate_many(scenarios), keep_alive)
+
+
+async def handle_connection(service, reader, writer):
+    try:
+        while True:
+            try:
+                request = await _read_request(reader)
+            except HTTPError as e:
+                await _send_json(writer, e.status, {"error": e.message}, False)
+                break
+            if request is None:
+                break
+            method, path, headers, body = request
+            connection = headers.get("connection", "").lower()
+            keep_alive = connection != "close" and (headers["http-version"] != "HTTP/1.0" or connection == "keep-alive")
+            try:
+                await _dispatch(service, method, path, body, writer, keep_alive)
+            except HTTPError as e:
+                await _send_json(writer, e.status, {"error": e.message}, keep_alive)
+            except Exception as e:
+                await _send_json(writer, 500, {"error": f"{type(e).__name__}: {e}"}, False)
+                break
+            if not keep_alive:
+                break
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(host="127.0.0.1", port=8765, workers=None):
+    service = EngineService(workers)
+    server = await asyncio.start_server(lambda r, w: handle_connection(service, r, w), host, port)
+    print(f"engine API on http://{host}:{port} ({service.workers} workers)", file=sys.stderr)
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("-w", "--workers", type=int, default=None, help="engine threads (default: CPUs)")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+"""VP: Monte Carlo enterprise value / bid range with diligence and macro effects."""
+from dataclasses import asdict, dataclass
+
+import numpy as np
+import pandas as pd
+
+from core.engine.finance import percentiles
+
+MACROS = ["Normal", "Expansion", "Mild Recession", "Severe Recession"]
+
+PRESETS = {
+    "Base": {"multiple": 8.6, "ebitda": 25, "growth": 8, "macro": "Normal"},
+    "Upside": {"multiple": 9.5, "ebitda": 28, "growth": 10, "macro": "Expansion"},
+    "Downside": {"multiple": 7.5, "ebitda": 21, "growth": 4, "macro": "Mild Recession"},
+    "Custom": None,
+}
+
+COMPS = pd.DataFrame({
+    "Company": ["Alpha", "Beta", "Gamma", "Delta", "Epsilon", "Target"],
+    "EBITDA_Multiple": [8.5, 9.2, 7.8, 10.1, 8.0, 8.6],
+    "Growth": [10, 8, 7, 12, 9, 8],
+    "Margin": [18, 20, 15, 22, 19, 19]
+}).set_index("Company")
+
+# (macro multiple shift, macro growth shift)
+MACRO_EFFECTS = {
+    "Normal": (0.0, 0.0),
+    "Expansion": (0.5, 1.0),
+    "Mild Recession": (-0.7, -2.0),
+    "Severe Recession": (-1.0, -4.0),
+}
+
+
+@dataclass(frozen=True)
+class VPParams:
+    multiple: float = 8.6
+    ebitda: float = 25
+    growth: float = 8
+    macro: str = "Normal"
+    include_consultant_growth: bool = True
+    include_supplier_lock: bool = True
+    include_churn_risk: bool = False
+
+
+@dataclass
+class VPResult:
+    ev: np.ndarray
+    multiple: np.ndarray
+    ebitda: np.ndarray
+    growth: np.ndarray
+
+    def summary(self):
+        p25, p50, p75 = percentiles(self.ev)
+        return {"p25": p25, "p50": p50, "p75": p75}
+
+
+def adjust(params):
+    """Deterministic multiple and growth after diligence findings and macro."""
+    adj_growth = params.growth + (2 if params.include_consultant_growth else 0)
+    adj_multiple = params.multiple
+    if params.include_supplier_lock:
+        adj_multiple -= 0.5
+    if params.include_churn_risk:
+        adj_multiple -= 0.5
+    d_mult, d_growth = MACRO_EFFECTS[params.macro]
+    return adj_multiple + d_mult, adj_growth + d_growth
+
+
+def rules(params):
+    """Diligence findings switched on, as shown to users and the AI persona."""
+    msgs = []
+    if params.include_consultant_growth:
+        msgs.append("Consultant Growth Forecast (+2% growth)")
+    if params.include_supplier_lock:
+        msgs.append("Supplier Price Lock (-0.5x multiple)")
+    if params.include_churn_risk:
+        msgs.append("Customer Churn Risk (-0.5x multiple)")
+    return msgs
+
+
+def simulate(params, n_runs=500, seed=None):
+    rng = np.random.default_rng(seed)
+    n = int(n_runs)
+    adj_multiple, adj_growth = adjust(params)
+    mult = rng.normal(adj_multiple, 0.3, n)
+    eb = rng.normal(params.ebitda, 2, n)
+    g = rng.normal(adj_growth, 1.2, n)
+    # Severe recession widens the downside on both multiple and growth
+    if params.macro == "Severe Recession":
+        mult -= np.abs(rng.normal(0.3, 0.2, n))
+        g -= np.abs(rng.normal(1, 0.5, n))
+    return VPResult(eb * mult, mult, eb, g)
+
+
+def run(params=None, n_runs=500, seed=None):
+    """Batch entry point: flat dict of inputs and summary metrics."""
+    params = params if isinstance(params, VPParams) else VPParams(**(params or {}))
+    adj_multiple, adj_growth = adjust(params)
+    return {**asdict(params), "adj_multiple": adj_multiple, "adj_growth": adj_growth,
+            **simulate(params, n_runs, seed).summary()}
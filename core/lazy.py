@@ -0,0 +1,49 @@
+"""Deferred imports for heavy dependencies.
+
+``openai = lazy_import("openai")`` binds a stand-in that imports the real
+module on first attribute access. Modules that only some code paths need
+(the OpenAI client when a review is requested, token counting) then cost
+nothing at page load.
+"""
+import importlib
+import sys
+
+
+class LazyModule:
+    """Proxy for a module that is imported the first time it is used."""
+
+    __slots__ = ("_name", "_module")
+
+    def __init__(self, name):
+        object.__setattr__(self, "_name", name)
+        object.__setattr__(self, "_module", None)
+
+    def _load(self):
+        module = object.__getattribute__(self, "_module")
+        if module is None:
+            module = importlib.import_module(object.__getattribute__(self, "_name"))
+            object.__setattr__(self, "_module", module)
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self._load(), attr, value)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        name = object.__getattribute__(self, "_name")
+        state = "loaded" if object.__getattribute__(self, "_module") is not None else "not loaded"
+        return f"<lazy module {name!r} ({state})>"
+
+
+def lazy_import(name):
+    """The module itself if it is already imported, else a ``LazyModule``."""
+    return sys.modules.get(name) or LazyModule(name)
+
+
+def is_loaded(name):
+    return name in sys.modules
@@ -0,0 +1,43 @@
+"""LLM gateway: cached, pluggable chat completions for the persona reviews."""
+from core.llm.backends import OpenAIBackend, StubBackend
+from core.llm.cache import DiskStore, MemoryLRU, ResponseCache, cache_key
+from core.llm.client import ClientMetrics, PooledClient, RetryPolicy, TokenBucket
+from core.llm.gateway import (
+    DEFAULT_MODEL,
+    CallStats,
+    LLMGateway,
+    approx_tokens,
+    gateway_from_env,
+    get_gateway,
+)
+from core.llm.panel import SYNTHESIS_SYSTEM, run_panel, synthesis_prompt
+from core.llm.summary import Summary, SummaryBuilder, mapping_deltas, series_changes, table_deltas
+from core.llm.tokens import count_tokens
+
+__all__ = [
+    "DEFAULT_MODEL",
+    "CallStats",
+    "ClientMetrics",
+    "DiskStore",
+    "LLMGateway",
+    "MemoryLRU",
+    "OpenAIBackend",
+    "PooledClient",
+    "ResponseCache",
+    "RetryPolicy",
+    "SYNTHESIS_SYSTEM",
+    "StubBackend",
+    "Summary",
+    "SummaryBuilder",
+    "TokenBucket",
+    "approx_tokens",
+    "cache_key",
+    "count_tokens",
+    "gateway_from_env",
+    "get_gateway",
+    "mapping_deltas",
+    "run_panel",
+    "series_changes",
+    "synthesis_prompt",
+    "table_deltas",
+]
@@ -0,0 +1,130 @@
+"""Chat-completion backends the gateway can route to.
+
+A backend needs ``name``, ``requires_key``,
+``complete(model, system, user, **params) -> str``, its coroutine twin
+``acomplete`` and ``stream(model, system, user, usage, **params)``, a
+generator of text chunks that fills ``usage`` with
+``prompt_tokens``/``completion_tokens`` when known. Closing the generator
+must release the underlying request.
+"""
+import asyncio
+import hashlib
+import time
+
+from core.llm.client import pool_from_env
+from core.llm.tokens import approx_tokens
+
+
+class OpenAIBackend:
+    """OpenAI chat completions through the shared ``PooledClient``."""
+
+    name = "openai"
+    requires_key = True
+    completion_budget = 800  # tokens reserved against TPM when max_tokens is unset
+
+    def __init__(self, pool=None):
+        self.pool = pool or pool_from_env()
+
+    def _tokens(self, system, user, params):
+        return approx_tokens(system) + approx_tokens(user) + params.get("max_tokens", self.completion_budget)
+
+    @staticmethod
+    def _messages(system, user):
+        return [
+            {"role": "system", "content": system},
+            {"role": "user", "content": user},
+        ]
+
+    def complete(self, model, system, user, **params):
+        response = self.pool.call(
+            lambda client: client.chat.completions.create(
+                model=model, messages=self._messages(system, user), **params),
+            tokens=self._tokens(system, user, params),
+        )
+        return response.choices[0].message.content.strip()
+
+    async def acomplete(self, model, system, user, **params):
+        response = await self.pool.acall(
+            lambda client: client.chat.completions.create(
+                model=model, messages=self._messages(system, user), **params),
+            tokens=self._tokens(system, user, params),
+        )
+        return response.choices[0].message.content.strip()
+
+    def stream(self, model, system, user, usage, **params):
+        # Retries cover opening the stream; a stream that breaks midway is not replayed
+        response = self.pool.call(
+            lambda client: client.chat.completions.create(
+                model=model, messages=self._messages(system, user), stream=True,
+                stream_options={"include_usage": True}, **params),
+            tokens=self._tokens(system, user, params),
+        )
+        try:
+            for chunk in response:
+                if chunk.usage is not None:
+                    usage["prompt_tokens"] = chunk.usage.prompt_tokens
+                    usage["completion_tokens"] = chunk.usage.completion_tokens
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            # Drops the HTTP stream if the consumer stopped early
+            response.close()
+
+
+class StubBackend:
+    """Offline backend returning a deterministic memo built from the prompt.
+
+    ``latency`` (seconds) simulates the round trip so the review path can be
+    benchmarked without network access or an API key. When streaming, the
+    reply is emitted ``chunk_words`` words at a time, the first chunk after
+    ``first_token_delay`` and each following one after ``chunk_delay``.
+    """
+
+    name = "stub"
+    requires_key = False
+
+    def __init__(self, latency=0.0, first_token_delay=0.0, chunk_delay=0.0, chunk_words=1):
+        self.latency = latency
+        self.first_token_delay = first_token_delay
+        self.chunk_delay = chunk_delay
+        self.chunk_words = max(1, int(chunk_words))
+        self.calls = 0
+
+    def complete(self, model, system, user, **params):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return self._reply(model, system, user)
+
+    async def acomplete(self, model, system, user, **params):
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._reply(model, system, user)
+
+    def stream(self, model, system, user, usage, **params):
+        self.calls += 1
+        words = self._reply(model, system, user).split(" ")
+        usage["prompt_tokens"] = len(system.split()) + len(user.split())
+        usage["completion_tokens"] = 0
+        for i in range(0, len(words), self.chunk_words):
+            delay = self.first_token_delay if i == 0 else self.chunk_delay
+            if delay:
+                time.sleep(delay)
+            piece = " ".join(words[i:i + self.chunk_words])
+            usage["completion_tokens"] += len(piece.split())
+            yield piece if i == 0 else " " + piece
+
+    @staticmethod
+    def _reply(model, system, user):
+        digest = hashlib.sha1(f"{system}\n{user}".encode("utf-8")).hexdigest()[:8]
+        lines = [line.strip() for line in user.splitlines() if line.strip()]
+        return (
+            f"[stub {model} #{digest}] {system}\n\n"
+            "1. Key drivers: " + (lines[1] if len(lines) > 1 else "n/a") + "\n"
+            "2. Actions: tighten assumptions, stress-test downside, track KPIs monthly.\n"
+            "3. Recommendation: proceed subject to the risks above."
+        )
+
+
+BACKENDS = {"openai": OpenAIBackend, "stub": StubBackend}
@@ -0,0 +1,263 @@
+"""Process-wide pooled OpenAI client with rate limiting and retries.
+
+One ``PooledClient`` is shared by every session. It keeps a keep-alive HTTP
+connection pool, queues callers behind request-per-minute and
+token-per-minute buckets sized to the org's limits, retries 429/5xx and
+connection errors with jittered exponential backoff (honouring
+``Retry-After``), and records queue depth, retries and latency percentiles.
+
+``OPENAI_BASE_URL`` (read by the OpenAI SDK) points it at a local mock server.
+"""
+import asyncio
+from collections import deque
+import os
+import random
+import threading
+import time
+
+from core import tracing
+from core.lazy import lazy_import
+
+# Imported on the first real API call, not when a page loads
+httpx = lazy_import("httpx")
+np = lazy_import("numpy")
+openai = lazy_import("openai")
+
+
+class TokenBucket:
+    """Continuously refilled bucket of ``per_minute`` units.
+
+    ``reserve`` debits immediately and returns how long the caller must wait
+    for the balance to cover it, so concurrent callers queue in arrival order.
+    """
+
+    def __init__(self, per_minute, burst=None):
+        self.rate = per_minute / 60.0
+        self.capacity = float(burst if burst is not None else per_minute)
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount=1.0):
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self._tokens -= min(amount, self.capacity)
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+
+class RetryPolicy:
+    """Full-jitter exponential backoff."""
+
+    def __init__(self, max_retries=5, base=0.5, cap=20.0):
+        self.max_retries = max_retries
+        self.base = base
+        self.cap = cap
+
+    def delay(self, attempt, error=None):
+        retry_after = _retry_after(error)
+        if retry_after is not None:
+            return min(self.cap, retry_after)
+        return random.uniform(0, min(self.cap, self.base * 2 ** attempt))
+
+
+def _retry_after(error):
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def is_retryable(error):
+    """Rate limits, server errors, timeouts and dropped connections."""
+    if isinstance(error, (openai.APIConnectionError, openai.APITimeoutError)):
+        return True
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code == 429 or error.status_code >= 500
+    return False
+
+
+class ClientMetrics:
+    """Counters and a rolling latency window for the shared client."""
+
+    def __init__(self, window=1000):
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        self.requests = 0
+        self.retries = 0
+        self.failures = 0
+        self.queue_wait = 0.0
+        self.latencies = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def enqueue(self):
+        with self._lock:
+            self.queue_depth += 1
+            self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+
+    def dequeue(self, waited):
+        with self._lock:
+            self.queue_depth -= 1
+            self.queue_wait += waited
+
+    def record(self, latency=None, retried=False, failed=False):
+        with self._lock:
+            if retried:
+                self.retries += 1
+            elif failed:
+                self.failures += 1
+            else:
+                self.requests += 1
+                self.latencies.append(latency)
+
+    def snapshot(self):
+        with self._lock:
+            latencies = list(self.latencies)
+            snap = {
+                "queue_depth": self.queue_depth,
+                "max_queue_depth": self.max_queue_depth,
+                "requests": self.requests,
+                "retries": self.retries,
+                "failures": self.failures,
+                "queue_wait_s": round(self.queue_wait, 4),
+            }
+        for q in (50, 95, 99):
+            snap[f"latency_p{q}_s"] = float(np.percentile(latencies, q)) if latencies else None
+        return snap
+
+
+class PooledClient:
+    """Rate-limited, retrying wrapper around one sync and one async OpenAI client."""
+
+    def __init__(self, api_key=None, rpm=500, tpm=30000, pool_size=20, keepalive=60.0,
+                 timeout=60.0, retry=None):
+        self.api_key = api_key or os.getenv("OPENAI_API_KEY")
+        self.pool_size = pool_size
+        self.keepalive = keepalive
+        self.timeout = timeout
+        self.requests_bucket = TokenBucket(rpm)
+        self.tokens_bucket = TokenBucket(tpm)
+        self.retry = retry or RetryPolicy()
+        self.metrics = ClientMetrics()
+        self._client = None
+        self._async_client = None
+        self._lock = threading.Lock()
+
+    def _limits(self):
+        return httpx.Limits(max_connections=self.pool_size,
+                            max_keepalive_connections=self.pool_size,
+                            keepalive_expiry=self.keepalive)
+
+    @property
+    def client(self):
+        with self._lock:
+            if self._client is None:
+                self._client = openai.OpenAI(
+                    api_key=self.api_key,
+                    max_retries=0,  # retries are ours, so they are limited and counted
+                    timeout=self.timeout,
+                    http_client=openai.DefaultHttpxClient(limits=self._limits()),
+                )
+            return self._client
+
+    @property
+    def async_client(self):
+        # Only ever used on the background loop, so its pool is reused
+        with self._lock:
+            if self._async_client is None:
+                self._async_client = openai.AsyncOpenAI(
+                    api_key=self.api_key,
+                    max_retries=0,
+                    timeout=self.timeout,
+                    http_client=openai.DefaultAsyncHttpxClient(limits=self._limits()),
+                )
+            return self._async_client
+
+    def _admission_wait(self, tokens):
+        return max(self.requests_bucket.reserve(1), self.tokens_bucket.reserve(tokens))
+
+    def call(self, fn, tokens=1):
+        """Run ``fn(client)`` once the limiter admits it, retrying transient errors."""
+        for attempt in range(self.retry.max_retries + 1):
+            wait = self._admission_wait(tokens)
+            if wait:
+                self.metrics.enqueue()
+                time.sleep(wait)
+                self.metrics.dequeue(wait)
+            start = time.perf_counter()
+            try:
+                result = fn(self.client)
+            except Exception as e:
+                if attempt < self.retry.max_retries and is_retryable(e):
+                    self.metrics.record(retried=True)
+                    time.sleep(self.retry.delay(attempt, e))
+                    continue
+                self.metrics.record(failed=True)
+                raise
+            self.metrics.record(time.perf_counter() - start)
+            return result
+
+    async def acall(self, fn, tokens=1):
+        """Coroutine version of ``call``; ``fn(async_client)`` returns an awaitable."""
+        for attempt in range(self.retry.max_retries + 1):
+            wait = self._admission_wait(tokens)
+            if wait:
+                self.metrics.enqueue()
+                await asyncio.sleep(wait)
+                self.metrics.dequeue(wait)
+            start = time.perf_counter()
+            try:
+                result = await fn(self.async_client)
+            except Exception as e:
+                if attempt < self.retry.max_retries and is_retryable(e):
+                    self.metrics.record(retried=True)
+                    await asyncio.sleep(self.retry.delay(attempt, e))
+                    continue
+                self.metrics.record(failed=True)
+                raise
+            self.metrics.record(time.perf_counter() - start)
+            return result
+
+
+def pool_from_env():
+    """``LLM_RPM``, ``LLM_TPM``, ``LLM_POOL_SIZE``, ``LLM_TIMEOUT``, ``LLM_MAX_RETRIES``.
+
+    The client's metrics are exported through ``tracing`` as ``app_llm_client_*``.
+    """
+    pool = PooledClient(
+        rpm=float(os.getenv("LLM_RPM", 500)),
+        tpm=float(os.getenv("LLM_TPM", 30000)),
+        pool_size=int(os.getenv("LLM_POOL_SIZE", 20)),
+        timeout=float(os.getenv("LLM_TIMEOUT", 60)),
+        retry=RetryPolicy(max_retries=int(os.getenv("LLM_MAX_RETRIES", 5))),
+    )
+    tracing.add_gauges("llm_client", pool.metrics.snapshot)
+    return pool
+
+
+_loop = None
+_loop_lock = threading.Lock()
+
+
+def background_loop():
+    """Event loop on a daemon thread shared by all async LLM work.
+
+    Async HTTP clients are bound to one loop; running every coroutine here
+    (instead of a fresh ``asyncio.run`` per click) keeps their pools warm.
+    """
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="llm-loop", daemon=True).start()
+        return _loop
+
+
+def run_async(coro):
+    """Run ``coro`` on the background loop and block for its result."""
+    return asyncio.run_coroutine_threadsafe(coro, background_loop()).result()
@@ -0,0 +1,194 @@
+"""Single entry point for LLM calls from every page."""
+from collections import deque
+from dataclasses import dataclass
+import functools
+import os
+import threading
+import time
+
+from core import tracing
+from core.llm.backends import BACKENDS, StubBackend
+from core.llm.cache import DiskStore, MemoryLRU, ResponseCache, cache_key
+from core.llm.tokens import approx_tokens
+
+DEFAULT_MODEL = "gpt-4o"
+
+
+@dataclass
+class CallStats:
+    """Latency and size of one gateway call."""
+
+    model: str
+    backend: str
+    cached: bool
+    ttft: float = None  # seconds to first chunk; None if nothing arrived
+    total: float = 0.0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cancelled: bool = False
+    error: str = None
+
+
+class LLMGateway:
+    """Routes completions to a backend, serving byte-identical requests from
+    the response cache. The last ``history`` calls are kept in ``calls``."""
+
+    def __init__(self, backend, cache=None, history=200):
+        self.backend = backend
+        self.cache = cache
+        self.calls = deque(maxlen=history)
+        self._lock = threading.Lock()
+
+    def _record(self, stats):
+        with self._lock:
+            self.calls.append(stats)
+
+    def _cached(self, key, model, system, user):
+        if self.cache is None:
+            return None
+        cached = self.cache.get(key)
+        if cached is not None:
+            stats = CallStats(model, self.backend.name, True, prompt_tokens=approx_tokens(system + user),
+                              completion_tokens=approx_tokens(cached))
+            return cached, stats
+        return None
+
+    def complete(self, system, user, model=DEFAULT_MODEL, on_stats=None, **params):
+        start = time.perf_counter()
+        key = cache_key(model, system, user, params)
+        hit = self._cached(key, model, system, user)
+        if hit is not None:
+            return self._finish_hit(hit, start, on_stats)
+        stats = CallStats(model, self.backend.name, False,
+                          prompt_tokens=approx_tokens(system + user))
+        try:
+            text = self.backend.complete(model, system, user, **params)
+            stats.completion_tokens = approx_tokens(text)
+        except Exception as e:
+            stats.error = str(e)
+            raise
+        finally:
+            self._finish(stats, start, on_stats)
+        if self.cache is not None:
+            self.cache.put(key, text)
+        return text
+
+    async def acomplete(self, system, user, model=DEFAULT_MODEL, on_stats=None, **params):
+        """Coroutine version of ``complete`` for concurrent calls."""
+        start = time.perf_counter()
+        key = cache_key(model, system, user, params)
+        hit = self._cached(key, model, system, user)
+        if hit is not None:
+            return self._finish_hit(hit, start, on_stats)
+        stats = CallStats(model, self.backend.name, False,
+                          prompt_tokens=approx_tokens(system + user))
+        try:
+            text = await self.backend.acomplete(model, system, user, **params)
+            stats.completion_tokens = approx_tokens(text)
+        except Exception as e:
+            stats.error = str(e)
+            raise
+        finally:
+            self._finish(stats, start, on_stats)
+        if self.cache is not None:
+            self.cache.put(key, text)
+        return text
+
+    def _finish_hit(self, hit, start, on_stats):
+        text, stats = hit
+        self._finish(stats, start, on_stats)
+        return text
+
+    def _finish(self, stats, start, on_stats):
+        stats.total = time.perf_counter() - start
+        if stats.ttft is None and stats.error is None and not stats.cancelled:
+            # Non-streamed replies arrive all at once
+            stats.ttft = stats.total
+        self._record(stats)
+        tracing.record("llm", stats.total, model=stats.model, backend=stats.backend, cached=stats.cached,
+                       cancelled=stats.cancelled, error=stats.error)
+        if stats.ttft is not None:
+            tracing.record("llm.first_token", stats.ttft)
+        if on_stats is not None:
+            on_stats(stats)
+
+    def stream(self, system, user, model=DEFAULT_MODEL, cancel=None, on_stats=None, **params):
+        """Yield the completion in chunks as they arrive.
+
+        Setting the ``cancel`` event, or closing the generator (which is what
+        happens when Streamlit interrupts a rerun), stops the backend stream.
+        Only complete responses are cached; a cache hit is yielded at once.
+        ``on_stats`` receives this call's ``CallStats`` once it ends.
+        """
+        start = time.perf_counter()
+        key = cache_key(model, system, user, params)
+        hit = self._cached(key, model, system, user)
+        if hit is not None:
+            yield self._finish_hit(hit, start, on_stats)
+            return
+
+        stats = CallStats(model, self.backend.name, False)
+        usage = {}
+        parts = []
+        chunks = self.backend.stream(model, system, user, usage, **params)
+        finished = False
+        try:
+            for piece in chunks:
+                if stats.ttft is None:
+                    stats.ttft = time.perf_counter() - start
+                parts.append(piece)
+                yield piece
+                if cancel is not None and cancel.is_set():
+                    break
+            else:
+                finished = True
+        except Exception as e:
+            stats.error = str(e)
+            raise
+        finally:
+            chunks.close()
+            text = "".join(parts)
+            stats.cancelled = not finished and stats.error is None
+            stats.prompt_tokens = usage.get("prompt_tokens") or approx_tokens(system + user)
+            stats.completion_tokens = usage.get("completion_tokens") or approx_tokens(text)
+            self._finish(stats, start, on_stats)
+            if finished and self.cache is not None and text:
+                self.cache.put(key, text.strip())
+
+
+def gateway_from_env():
+    """Build a gateway from environment variables.
+
+    - ``LLM_BACKEND``: ``openai`` (default) or ``stub``
+    - ``LLM_STUB_LATENCY``: simulated stub round trip in seconds
+    - ``LLM_STUB_FIRST_TOKEN_DELAY`` / ``LLM_STUB_CHUNK_DELAY``: streamed stub timing
+    - ``LLM_CACHE``: set to ``0`` to disable response caching
+    - ``LLM_CACHE_DIR`` / ``LLM_CACHE_TTL`` (s) / ``LLM_CACHE_MAX_MB``: disk store
+    """
+    name = os.getenv("LLM_BACKEND", "openai").lower()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown LLM_BACKEND {name!r}; choose from {sorted(BACKENDS)}")
+    if name == "stub":
+        backend = StubBackend(
+            latency=float(os.getenv("LLM_STUB_LATENCY", "0")),
+            first_token_delay=float(os.getenv("LLM_STUB_FIRST_TOKEN_DELAY", "0")),
+            chunk_delay=float(os.getenv("LLM_STUB_CHUNK_DELAY", "0")),
+        )
+    else:
+        backend = BACKENDS[name]()
+
+    cache = None
+    if os.getenv("LLM_CACHE", "1") != "0":
+        disk = DiskStore(
+            os.getenv("LLM_CACHE_DIR", os.path.join(".cache", "llm")),
+            ttl=float(os.getenv("LLM_CACHE_TTL", 24 * 3600)),
+            max_bytes=int(float(os.getenv("LLM_CACHE_MAX_MB", 100)) * 2**20),
+        )
+        cache = ResponseCache(MemoryLRU(), disk)
+    return LLMGateway(backend, cache)
+
+
+@functools.lru_cache(maxsize=None)
+def get_gateway():
+    """Process-wide gateway shared by all sessions."""
+    return gateway_from_env()
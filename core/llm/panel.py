@@ -0,0 +1,63 @@
+"""Concurrent multi-persona review panel.
+
+All persona prompts go out at once through ``LLMGateway.acomplete`` (bounded by
+a semaphore), so the panel takes about as long as its slowest reviewer rather
+than the sum of all of them.
+"""
+import asyncio
+import os
+
+from core.llm.client import run_async
+from core.llm.gateway import DEFAULT_MODEL
+
+DEFAULT_CONCURRENCY = int(os.getenv("LLM_PANEL_CONCURRENCY", "3"))
+
+SYNTHESIS_SYSTEM = (
+    "You are the chair of a private equity investment committee, consolidating "
+    "reviews from several advisors into one decision memo."
+)
+
+
+async def _gather_panel(gateway, reviews, model, max_concurrency, stats):
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def review(persona, system, user):
+        async with semaphore:
+            return await gateway.acomplete(
+                system, user, model=model,
+                on_stats=lambda s: stats.__setitem__(persona, s),
+            )
+
+    answers = await asyncio.gather(
+        *(review(persona, system, user) for persona, (system, user) in reviews.items()),
+        return_exceptions=True,
+    )
+    return dict(zip(reviews, answers))
+
+
+def run_panel(gateway, reviews, model=DEFAULT_MODEL, max_concurrency=DEFAULT_CONCURRENCY):
+    """Ask every persona concurrently.
+
+    ``reviews`` maps persona -> (system prompt, user prompt). Returns
+    ``(answers, stats)`` keyed by persona; a failed call's answer is the
+    exception it raised, so one bad reviewer does not sink the panel.
+    """
+    stats = {}
+    answers = run_async(_gather_panel(gateway, reviews, model, max_concurrency, stats))
+    return answers, stats
+
+
+def synthesis_prompt(answers):
+    """User prompt asking for one memo that merges the panel's answers."""
+    sections = "\n\n".join(
+        f"--- {persona} ---\n{answer}"
+        for persona, answer in answers.items()
+        if not isinstance(answer, BaseException)
+    )
+    return (
+        "Merge the advisor reviews below into a single board-ready memo:\n"
+        "1. Where the advisors agree.\n"
+        "2. Where they disagree, and which view you side with.\n"
+        "3. A final recommendation with the 3 most important next actions.\n\n"
+        f"{sections}"
+    )
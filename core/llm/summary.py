@@ -0,0 +1,151 @@
+"""Token-budgeted scenario summaries for persona prompts.
+
+Pages used to paste whole ``DataFrame.to_dict()`` dumps and lists into their
+prompts, so prompt size (and latency and cost) grew with the data. A
+``SummaryBuilder`` instead takes fixed facts plus scored rows (usually KPI
+deltas against target), drops rows below a signal floor, and keeps the
+highest-signal rows that fit within a token budget, in their original order.
+Fixed facts come first; if they alone overrun the budget, the later ones are
+cut short or dropped, so the summary never exceeds the budget by more than
+its "omitted" notes.
+"""
+from dataclasses import dataclass, field
+import os
+
+from core.llm.tokens import count_tokens, truncate_tokens
+
+DEFAULT_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", "600"))
+
+
+@dataclass
+class Summary:
+    text: str
+    tokens: int
+    dropped: int = 0
+
+
+@dataclass
+class _Section:
+    header: str
+    rows: list = field(default_factory=list)  # (signal, line)
+    fixed: bool = False
+    min_signal: float = 0.0
+
+
+def _fmt(value):
+    return f"{value:,.2f}".rstrip("0").rstrip(".") if isinstance(value, float) else f"{value}"
+
+
+def table_deltas(frame, actual="Simulated", target="Target", baseline="Current",
+                 lower_is_better=()):
+    """One scored line per row of ``frame``: actual vs target, plus the baseline.
+
+    The signal is the relative gap to target, so the KPIs furthest off track
+    survive the budget first.
+    """
+    rows = []
+    for name, row in frame.iterrows():
+        act, tgt = float(row[actual]), float(row[target])
+        gap = (act - tgt) / abs(tgt) if tgt else 0.0
+        behind = gap > 0 if name in lower_is_better else gap < 0
+        line = f"{name}: {_fmt(act)} vs target {_fmt(tgt)} ({gap:+.1%}, {'off' if behind else 'on'} track)"
+        if baseline is not None and baseline in row:
+            line += f", from {_fmt(float(row[baseline]))}"
+        rows.append((abs(gap) + (1.0 if behind else 0.0), line))
+    return rows
+
+
+def mapping_deltas(values, reference, label="vs"):
+    """Scored lines for ``values`` against ``reference`` (same keys), e.g. budgets."""
+    rows = []
+    for key, value in values.items():
+        ref = reference.get(key)
+        if ref is None:
+            rows.append((0.0, f"{key}: {_fmt(value)}"))
+            continue
+        change = (value - ref) / abs(ref) if ref else 0.0
+        rows.append((abs(change), f"{key}: {_fmt(value)} ({label} {_fmt(ref)}, {change:+.0%})"))
+    return rows
+
+
+def series_changes(frame):
+    """Scored first-to-last change of every column of a time-indexed frame."""
+    rows = []
+    if frame.empty:
+        return rows
+    first, last = frame.iloc[0], frame.iloc[-1]
+    span = f"{frame.index[0]:%Y-%m-%d}→{frame.index[-1]:%Y-%m-%d}" if hasattr(frame.index[0], "strftime") else ""
+    for col in frame.columns:
+        a, b = float(first[col]), float(last[col])
+        change = (b - a) / abs(a) if a else 0.0
+        rows.append((abs(change), f"{col}: {_fmt(a)} → {_fmt(b)} ({change:+.1%}) {span}".rstrip()))
+    return rows
+
+
+class SummaryBuilder:
+    """Collects facts and scored rows, then renders them within ``budget`` tokens."""
+
+    def __init__(self, budget=DEFAULT_BUDGET, model="gpt-4o", min_signal=0.0):
+        self.budget = budget
+        self.model = model
+        self.min_signal = min_signal
+        self._sections = []
+
+    def add(self, text):
+        """A short fact kept ahead of any rows (cut only if facts alone overrun
+        the budget). Use ``add_rows`` for anything that grows with the data."""
+        if text:
+            self._sections.append(_Section(text, fixed=True))
+        return self
+
+    def add_rows(self, header, rows, min_signal=None):
+        """``rows`` are ``(signal, line)``; low-signal ones go first when over
+        budget and ones below ``min_signal`` are never sent."""
+        floor = self.min_signal if min_signal is None else min_signal
+        self._sections.append(_Section(header, list(rows), min_signal=floor))
+        return self
+
+    def build(self):
+        used = sum(count_tokens(s.header, self.model) + 1 for s in self._sections if not s.fixed)
+        used += 8 * sum(not s.fixed for s in self._sections)  # room for "omitted" notes
+        facts = {}
+        dropped = 0
+        for i, s in enumerate(self._sections):
+            if not s.fixed:
+                continue
+            text = truncate_tokens(s.header, self.budget - used - 1, self.model)
+            if not text:
+                dropped += 1
+                continue
+            facts[i] = text
+            used += count_tokens(text, self.model) + 1
+        candidates = [
+            (signal, i, j, s.min_signal)
+            for i, s in enumerate(self._sections)
+            for j, (signal, _) in enumerate(s.rows)
+        ]
+        keep = set()
+        for signal, i, j, floor in sorted(candidates, key=lambda c: -c[0]):
+            cost = count_tokens(f"- {self._sections[i].rows[j][1]}", self.model) + 1 if signal >= floor else 0
+            if signal < floor or used + cost > self.budget:
+                dropped += 1
+                continue
+            keep.add((i, j))
+            used += cost
+
+        lines = []
+        for i, s in enumerate(self._sections):
+            if s.fixed:
+                if i in facts:
+                    lines.append(facts[i])
+                continue
+            kept = [line for j, (_, line) in enumerate(s.rows) if (i, j) in keep]
+            omitted = len(s.rows) - len(kept)
+            if not kept and not omitted:
+                continue
+            lines.append(s.header)
+            lines.extend(f"- {line}" for line in kept)
+            if omitted:
+                lines.append(f"- (+{omitted} lower-signal rows omitted)")
+        text = "\n".join(lines)
+        return Summary(text, count_tokens(text, self.model), dropped)
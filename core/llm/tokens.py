@@ -0,0 +1,50 @@
+"""Token counting for prompts and replies.
+
+``count_tokens`` uses ``tiktoken`` when it is installed (and its encoding is
+available offline); otherwise it falls back to the ~4 characters per token
+heuristic, which is close enough for budgeting English prompts.
+"""
+import functools
+
+
+def approx_tokens(text):
+    """Rough token count (~4 characters per token) when the backend reports none."""
+    return max(1, len(text) // 4) if text else 0
+
+
+@functools.lru_cache(maxsize=None)
+def _encoding(model):
+    try:
+        import tiktoken  # optional dependency; imported on the first count
+    except ImportError:
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("o200k_base")
+    except Exception:
+        # Encodings are downloaded on first use; stay usable offline
+        return None
+
+
+def count_tokens(text, model="gpt-4o"):
+    """Number of tokens ``model`` sees for ``text``."""
+    if not text:
+        return 0
+    encoding = _encoding(model)
+    if encoding is None:
+        return approx_tokens(text)
+    return len(encoding.encode(text))
+
+
+def truncate_tokens(text, max_tokens, model="gpt-4o"):
+    """``text`` cut to at most ``max_tokens`` tokens, ending in "…" when cut."""
+    if count_tokens(text, model) <= max_tokens:
+        return text
+    if max_tokens <= 1:
+        return ""
+    encoding = _encoding(model)
+    if encoding is None:
+        return text[:4 * (max_tokens - 1)].rstrip() + "…"
+    return encoding.decode(encoding.encode(text)[:max_tokens - 1]).rstrip() + "…"
@@ -0,0 +1,203 @@
+"""Memory-bounded store for Monte Carlo result arrays, shared by all sessions.
+
+Pages used to keep every simulated path in ``st.session_state``, so memory
+grew with the number of sessions and runs. Now the per-path arrays are
+``put`` here once per process as float32. The session only keeps the
+returned handle, the percentile summary and the chart bins.
+
+* Entries are keyed by a hash of their contents, or by an explicit scenario
+  key for seeded runs (``get_or_compute``). Identical results from
+  different sessions share one copy.
+* A global byte cap (``RESULT_STORE_MB``, default 256) evicts the least
+  recently used entries. With ``RESULT_STORE_DIR`` set, evicted entries are
+  first spilled to ``.npy`` files and later read back memory-mapped. That
+  directory is capped at ``RESULT_STORE_DISK_MB`` (default 2048).
+
+Arrays that must stay live outside the store (e.g. the stage arrays of an
+interactive simulation) are counted against the same cap with ``charge``
+and ``release``: they cannot be evicted here, but stored paths are evicted
+to make room for them.
+
+Pages read the paths back through the handle only on demand (the "Download
+simulated paths" button, ``ui.paths``). ``get`` returns ``None`` once a
+handle has been evicted for good, so callers keep anything they must always
+be able to show (summaries, bins) alongside the handle. Returned arrays are
+shared and read-only.
+"""
+from collections import OrderedDict
+import functools
+import hashlib
+import os
+import shutil
+import threading
+
+import numpy as np
+
+DTYPE = np.float32
+
+
+def scenario_key(*parts):
+    """Stable key for a deterministic scenario, e.g. ``(params, n_runs, seed)``."""
+    return hashlib.blake2b(repr(parts).encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _content_key(arrays):
+    digest = hashlib.blake2b(digest_size=16)
+    for name, a in arrays.items():
+        digest.update(f"{name}:{a.shape}".encode("utf-8"))
+        digest.update(memoryview(a).cast("B"))
+    return digest.hexdigest()
+
+
+def _compact(arrays):
+    out = {}
+    for name, a in arrays.items():
+        a = np.ascontiguousarray(a, dtype=DTYPE)
+        a.flags.writeable = False
+        out[name] = a
+    return out
+
+
+class ResultStore:
+    """Process-wide LRU of handle -> ``{name: float32 array}`` under a byte cap."""
+
+    def __init__(self, max_bytes=256 * 2**20, spill_dir=None, max_disk_bytes=2048 * 2**20):
+        self.max_bytes = max_bytes
+        self.spill_dir = spill_dir
+        self.max_disk_bytes = max_disk_bytes
+        self._entries = OrderedDict()  # handle -> arrays, in memory
+        self._spilled = OrderedDict()  # handle -> bytes on disk
+        self._charged = {}  # key -> bytes held live outside the store
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+
+    def put(self, arrays, key=None):
+        """Store ``arrays`` (a dict of 1-D arrays) and return their handle.
+
+        An entry that is already stored, in memory or spilled, is reused; with
+        an explicit ``key`` that check comes before converting or hashing
+        ``arrays``.
+        """
+        if key is not None:
+            with self._lock:
+                if self._reuse(key):
+                    return key
+        arrays = _compact(arrays)
+        handle = key or _content_key(arrays)
+        with self._lock:
+            if self._reuse(handle):
+                return handle
+            self._entries[handle] = arrays
+            self._bytes += sum(a.nbytes for a in arrays.values())
+            self._evict()
+        return handle
+
+    def get(self, handle):
+        """The arrays stored under ``handle``, or ``None`` if they were evicted."""
+        with self._lock:
+            arrays = self._entries.get(handle)
+            if arrays is not None:
+                self._entries.move_to_end(handle)
+                return arrays
+            if handle not in self._spilled:
+                return None
+            self._spilled.move_to_end(handle)
+        try:
+            return self._read_spilled(handle)
+        except OSError:
+            return None
+
+    def get_or_compute(self, key, compute):
+        """Handle for scenario ``key``, calling ``compute()`` for its arrays on a miss."""
+        with self._lock:
+            if self._reuse(key):
+                return key
+            self.misses += 1
+        return self.put(compute(), key=key)
+
+    def charge(self, key, nbytes):
+        """Count ``nbytes`` held live elsewhere under ``key`` against the cap
+        (replacing any earlier charge for ``key``)."""
+        with self._lock:
+            self._bytes += nbytes - self._charged.get(key, 0)
+            self._charged[key] = nbytes
+            self._evict()
+
+    def release(self, key):
+        """Stop counting the bytes charged under ``key``."""
+        with self._lock:
+            self._bytes -= self._charged.pop(key, 0)
+
+    def __contains__(self, handle):
+        with self._lock:
+            return handle in self._entries or handle in self._spilled
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._bytes,
+                    "charged_bytes": sum(self._charged.values()), "spilled": len(self._spilled),
+                    "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = sum(self._charged.values())
+            for handle in list(self._spilled):
+                shutil.rmtree(self._spill_path(handle), ignore_errors=True)
+            self._spilled.clear()
+
+    # Called with the lock held
+    def _reuse(self, handle):
+        """Count a hit and refresh ``handle`` if it is stored, in memory or spilled."""
+        for entries in (self._entries, self._spilled):
+            if handle in entries:
+                entries.move_to_end(handle)
+                self.hits += 1
+                return True
+        return False
+
+    def _evict(self):
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            handle, arrays = self._entries.popitem(last=False)
+            size = sum(a.nbytes for a in arrays.values())
+            self._bytes -= size
+            self.evictions += 1
+            if self.spill_dir:
+                self._spill(handle, arrays, size)
+
+    def _spill_path(self, handle):
+        return os.path.join(self.spill_dir, handle)
+
+    def _spill(self, handle, arrays, size):
+        path = self._spill_path(handle)
+        try:
+            os.makedirs(path, exist_ok=True)
+            for name, a in arrays.items():
+                np.save(os.path.join(path, f"{name}.npy"), a)
+        except OSError:
+            shutil.rmtree(path, ignore_errors=True)
+            return
+        self._spilled[handle] = size
+        while sum(self._spilled.values()) > self.max_disk_bytes and len(self._spilled) > 1:
+            old, _ = self._spilled.popitem(last=False)
+            shutil.rmtree(self._spill_path(old), ignore_errors=True)
+
+    def _read_spilled(self, handle):
+        path = self._spill_path(handle)
+        return {f[:-4]: np.load(os.path.join(path, f), mmap_mode="r")
+                for f in sorted(os.listdir(path)) if f.endswith(".npy")}
+
+
+def store_from_env():
+    return ResultStore(
+        max_bytes=int(float(os.getenv("RESULT_STORE_MB", 256)) * 2**20),
+        spill_dir=os.getenv("RESULT_STORE_DIR") or None,
+        max_disk_bytes=int(float(os.getenv("RESULT_STORE_DISK_MB", 2048)) * 2**20),
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def get_store():
+    """Process-wide result store shared by all sessions."""
+    return store_from_env()
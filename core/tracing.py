@@ -0,0 +1,273 @@
+"""Lightweight in-process tracing: timing spans, per-page histograms, exports.
+
+Off unless ``TRACING=1`` (or ``enable()``). When off, ``span()`` returns a
+shared no-op object and ``@traced`` adds one flag check per call, so the
+instrumentation can stay in the pages and engines permanently.
+
+When on, every finished span is:
+
+* added to a rolling window per (page, span), summarised by ``snapshot()``
+  as count / total / p50 / p95 / p99;
+* appended as one JSON line to ``TRACE_LOG`` (default ``.cache/trace.jsonl``);
+* exported by ``render_prometheus()``, which ``serve_metrics()`` (started
+  automatically when ``TRACING_METRICS_PORT`` is set) serves at ``/metrics``.
+
+Components with their own counters (e.g. the shared OpenAI client) publish
+them with ``add_gauges``; they are exported next to the spans.
+
+Spans without an explicit ``page`` inherit the page of the enclosing span,
+so engine and chart spans are attributed to the page that triggered them.
+"""
+from collections import defaultdict, deque
+import contextvars
+import functools
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import os
+import threading
+import time
+
+from core.lazy import lazy_import
+
+np = lazy_import("numpy")  # only for snapshots
+
+WINDOW = int(os.getenv("TRACE_WINDOW", "1024"))
+QUANTILES = (50, 95, 99)
+
+_page = contextvars.ContextVar("trace_page", default="-")
+_parent = contextvars.ContextVar("trace_parent", default=None)
+
+
+class _State:
+    def __init__(self):
+        self.enabled = False
+        self.log_path = None
+        self.log = None
+        self.windows = defaultdict(lambda: deque(maxlen=WINDOW))
+        self.totals = defaultdict(lambda: [0, 0.0])  # key -> [count, seconds]
+        self.gauges = {}  # name -> zero-argument callable returning {metric: number}
+        self.server = None
+        self.lock = threading.Lock()
+
+
+_state = _State()
+
+
+def enabled():
+    return _state.enabled
+
+
+def enable(log_path=None, metrics_port=None):
+    """Start recording; optionally log JSONL to ``log_path`` and serve metrics."""
+    with _state.lock:
+        _state.enabled = True
+        if log_path and log_path != _state.log_path:
+            if _state.log is not None:
+                _state.log.close()
+            os.makedirs(os.path.dirname(log_path) or ".", exist_ok=True)
+            _state.log = open(log_path, "a", encoding="utf-8", buffering=1)
+            _state.log_path = log_path
+    if metrics_port:
+        serve_metrics(int(metrics_port))
+
+
+def disable():
+    with _state.lock:
+        _state.enabled = False
+        if _state.log is not None:
+            _state.log.close()
+        _state.log = _state.log_path = None
+
+
+def reset():
+    """Drop all aggregated timings (the JSONL log is kept)."""
+    with _state.lock:
+        _state.windows.clear()
+        _state.totals.clear()
+
+
+def record(name, seconds, page=None, **attrs):
+    """Add an already measured duration, e.g. an LLM call's latency."""
+    if not _state.enabled:
+        return
+    page = page or _page.get()
+    key = (page, name)
+    with _state.lock:
+        _state.windows[key].append(seconds)
+        total = _state.totals[key]
+        total[0] += 1
+        total[1] += seconds
+        if _state.log is not None:
+            _state.log.write(json.dumps(
+                {"ts": time.time(), "page": page, "span": name, "seconds": seconds,
+                 "parent": _parent.get(), **attrs}, default=str) + "\n")
+
+
+class Span:
+    """Times a block as a context manager, or from ``start()`` to ``finish()``."""
+
+    def __init__(self, name, page=None, attrs=None):
+        self.name = name
+        self.page = page
+        self.attrs = attrs or {}
+        self._tokens = None
+        self._start = None
+
+    def start(self):
+        tokens = [_parent.set(self.name)]
+        if self.page:
+            tokens.append(_page.set(self.page))
+        self._tokens = tokens
+        self._start = time.perf_counter()
+        return self
+
+    def finish(self, **attrs):
+        if self._start is None:
+            return
+        seconds = time.perf_counter() - self._start
+        page = self.page or _page.get()
+        self._start = None
+        try:
+            for token in reversed(self._tokens):
+                token.var.reset(token)
+        except ValueError:
+            pass  # finished from another context (e.g. after a Streamlit rerun); nothing to restore
+        record(self.name, seconds, page, **self.attrs, **attrs)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.finish(**({"error": exc_type.__name__} if exc_type else {}))
+        return False
+
+
+class _NoopSpan:
+    def start(self):
+        return self
+
+    def finish(self, **attrs):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+def span(name, page=None, **attrs):
+    """``with span("simulate"):`` -- a no-op when tracing is off."""
+    if not _state.enabled:
+        return _NOOP
+    return Span(name, page, attrs)
+
+
+def start(name, page=None, **attrs):
+    """Begin a span to be ended with ``.finish()``, for spans that cannot wrap a block."""
+    return span(name, page, **attrs).start()
+
+
+def traced(name=None, page=None):
+    """Decorator form of ``span``; the span is named after the function by default."""
+    def decorate(fn):
+        label = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _state.enabled:
+                return fn(*args, **kwargs)
+            with Span(label, page):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def snapshot(page=None):
+    """Per-(page, span) rows: count, total and p50/p95/p99 seconds over the window."""
+    with _state.lock:
+        items = [(key, list(window), list(_state.totals[key])) for key, window in _state.windows.items()]
+    rows = []
+    for (p, name), window, (count, total) in sorted(items):
+        if page is not None and p != page:
+            continue
+        row = {"page": p, "span": name, "count": count, "total_s": total}
+        for q, v in zip(QUANTILES, np.percentile(window, QUANTILES)):
+            row[f"p{q}_s"] = float(v)
+        rows.append(row)
+    return rows
+
+
+def add_gauges(name, collect):
+    """Export ``collect()`` (a ``{metric: number}`` dict) as ``app_<name>_<metric>``
+    gauges. Registering a name again replaces its collector."""
+    with _state.lock:
+        _state.gauges[name] = collect
+
+
+def gauges():
+    """Current values of every registered collector, as ``{name: {metric: number}}``."""
+    with _state.lock:
+        collectors = list(_state.gauges.items())
+    return {name: collect() for name, collect in sorted(collectors)}
+
+
+def _metric_name(name, metric):
+    if metric.endswith("_s"):
+        metric = metric[:-2] + "_seconds"
+    return f"app_{name}_{metric}".replace(".", "_")
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def render_prometheus():
+    """All aggregated spans and registered gauges in the Prometheus text format."""
+    lines = ["# HELP app_span_seconds Duration of traced spans by page.",
+             "# TYPE app_span_seconds summary"]
+    for row in snapshot():
+        labels = f'page="{_label(row["page"])}",span="{_label(row["span"])}"'
+        for q in QUANTILES:
+            lines.append(f'app_span_seconds{{{labels},quantile="{q / 100}"}} {row[f"p{q}_s"]:.6f}')
+        lines.append(f"app_span_seconds_sum{{{labels}}} {row['total_s']:.6f}")
+        lines.append(f"app_span_seconds_count{{{labels}}} {row['count']}")
+    for name, values in gauges().items():
+        for metric, value in values.items():
+            if value is None:
+                continue
+            full = _metric_name(name, metric)
+            lines += [f"# TYPE {full} gauge", f"{full} {float(value):.6g}"]
+    return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_metrics(port, host="127.0.0.1"):
+    """Serve ``/metrics`` on a daemon thread (once per process); returns the server."""
+    with _state.lock:
+        if _state.server is None:
+            _state.server = ThreadingHTTPServer((host, port), _MetricsHandler)
+            threading.Thread(target=_state.server.serve_forever, name="trace-metrics", daemon=True).start()
+        return _state.server
+
+
+if os.getenv("TRACING", "0") not in ("", "0", "false", "False"):
+    enable(os.getenv("TRACE_LOG", os.path.join(".cache", "trace.jsonl")), os.getenv("TRACING_METRICS_PORT"))
@@ -0,0 +1,132 @@
+"""Downsampled, cached time-series data for KPI trend charts.
+
+Long KPI histories (years of daily or intraday points) are reduced to roughly
+one point per horizontal pixel before they reach the browser. Two
+shape-preserving reducers are available:
+
+- ``lttb``: Largest-Triangle-Three-Buckets, keeps the visually dominant points.
+- ``minmax``: keeps the min and max of every bucket, so spikes never vanish.
+
+``TrendCache`` memoizes the reduced frame per (data version, columns, date
+range, point budget), so reruns and zooming back out never redo the work and a
+zoomed range is downsampled from the full-resolution data on its own.
+"""
+from collections import OrderedDict
+import hashlib
+import threading
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_POINTS = 700  # ~ width of a Streamlit chart in the main column
+METHODS = ("lttb", "minmax")
+
+
+def lttb(x, y, n_out):
+    """Return the indices of the ``n_out`` points chosen by LTTB."""
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    # First and last points are always kept; the rest is split into buckets.
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    idx = np.empty(n_out, dtype=np.int64)
+    idx[0] = 0
+    idx[-1] = n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # Average of the next bucket is the third triangle vertex.
+        nlo, nhi = hi, edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[nlo:nhi].mean()
+        avg_y = y[nlo:nhi].mean()
+        area = np.abs(
+            (x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a])
+        )
+        a = lo + int(np.argmax(area))
+        idx[i + 1] = a
+    return idx
+
+
+def minmax(y, n_out):
+    """Return the indices of each bucket's min and max (``n_out`` points total)."""
+    n = len(y)
+    if n_out >= n or n_out < 4:
+        return np.arange(n)
+    y = np.asarray(y, dtype=float)
+    starts = np.linspace(0, n, n_out // 2, endpoint=False).astype(int)
+    mins = np.minimum.reduceat(y, starts)
+    maxs = np.maximum.reduceat(y, starts)
+    idx = []
+    for lo, hi, lo_v, hi_v in zip(starts, np.append(starts[1:], n), mins, maxs):
+        bucket = y[lo:hi]
+        idx.append(lo + int(np.argmax(bucket == lo_v)))
+        idx.append(lo + int(np.argmax(bucket == hi_v)))
+    idx.extend([0, n - 1])
+    return np.unique(idx)
+
+
+def downsample(frame, n_points=DEFAULT_POINTS, method="lttb"):
+    """Downsample ``frame`` (indexed by time) to at most ``n_points`` rows.
+
+    Each column is reduced on its own with an equal share of the budget and
+    the union of the kept rows is returned, so every series keeps its own
+    extremes on a shared index without exceeding the point budget.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown downsampling method: {method!r}")
+    if len(frame) <= n_points or not len(frame.columns):
+        return frame
+    per_column = max(n_points // len(frame.columns), 4)
+    index = frame.index
+    if isinstance(index, pd.DatetimeIndex):
+        x = index.asi8.astype(float)
+    else:
+        x = np.arange(len(frame), dtype=float)
+    keep = np.zeros(len(frame), dtype=bool)
+    for col in frame.columns:
+        y = frame[col].to_numpy(dtype=float)
+        keep[lttb(x, y, per_column) if method == "lttb" else minmax(y, per_column)] = True
+    return frame[keep]
+
+
+def data_version(*parts):
+    """Stable short hash of whatever inputs produced a frame."""
+    return hashlib.sha1(repr(parts).encode()).hexdigest()[:16]
+
+
+class TrendCache:
+    """LRU cache of downsampled trend frames.
+
+    The full-resolution frame is only touched on a miss; the key carries the
+    caller's data version instead of the data, so a hit costs nothing.
+    """
+
+    def __init__(self, max_entries=64):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, frame, version, columns, start=None, end=None,
+            n_points=DEFAULT_POINTS, method="lttb"):
+        key = (version, tuple(columns), start, end, n_points, method)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+        window = frame.loc[start:end, list(columns)]
+        result = downsample(window, n_points, method)
+        with self._lock:
+            self._entries[key] = result
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1 @@
+"""Streamlit rendering helpers shared by the role pages."""
@@ -0,0 +1,39 @@
+"""Engine computations memoized across Streamlit reruns.
+
+Streamlit reruns the whole page script on every widget change. These
+wrappers return the previous result while the inputs (hashed by
+``st.cache_data``) are unchanged, so moving one slider only recomputes what
+depends on it. Random Monte Carlo runs are deliberately left uncached:
+"Run Monte Carlo" must still draw fresh paths.
+"""
+import streamlit as st
+
+from core import tracing
+from core.engine import associate, cxo, management, operating_partner
+from core.trend import TrendCache
+
+MAX_ENTRIES = 256
+
+
+def _memo(fn):
+    name = f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__name__}"
+    return tracing.traced(name)(st.cache_data(max_entries=MAX_ENTRIES, show_spinner=False)(fn))
+
+
+clean_financials = _memo(associate.clean_financials)
+curate_comps = _memo(associate.curate_comps)
+sensitivity = _memo(associate.sensitivity)
+
+project_kpis = _memo(operating_partner.project_kpis)
+op_dashboard = _memo(operating_partner.dashboard)
+
+cxo_simulate = _memo(cxo.simulate)
+
+base_kpis = _memo(management.base_kpis)
+apply_initiatives = _memo(management.apply_initiatives)
+
+
+@st.cache_resource
+def trend_cache():
+    """Downsampled chart frames shared by all sessions, keyed on data version and range."""
+    return TrendCache()
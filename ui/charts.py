@@ -0,0 +1,53 @@
+"""Monte Carlo distribution charts drawn from precomputed bins.
+
+Pages bin a result once with ``core.engine.finance.histogram`` when the
+simulation runs and keep the bins with the result. Each rerun then sends
+only ``bins`` bars plus the percentile markers to the browser as a vector
+Vega-Lite chart. Drawing cost does not depend on the number of paths, and
+no figure objects are left behind between reruns.
+"""
+import streamlit as st
+
+from core import tracing
+
+BAR_COLOR = "#4c78a8"
+
+
+def histogram_spec(hist, markers, title, xlabel, ylabel=None, label=None):
+    """Vega-Lite spec for ``hist = (counts, edges)`` with dashed
+    ``(name, value, color)`` marker rules."""
+    counts, edges = hist
+    bars = [{"start": float(lo), "end": float(hi), "count": int(c), "series": label}
+            for c, lo, hi in zip(counts, edges[:-1], edges[1:])]
+    rules = [{"marker": name, "value": float(value)} for name, value, _ in markers]
+    names = ([label] if label else []) + [name for name, _, _ in markers]
+    colors = ([BAR_COLOR] if label else []) + [color for _, _, color in markers]
+    color = {"scale": {"domain": names, "range": colors}, "legend": {"title": None}}
+
+    bar_encoding = {
+        "x": {"field": "start", "type": "quantitative", "title": xlabel, "bin": {"binned": True}},
+        "x2": {"field": "end"},
+        "y": {"field": "count", "type": "quantitative", "title": ylabel or "Count"},
+    }
+    if label:
+        bar_encoding["color"] = {"field": "series", "type": "nominal", **color}
+    return {
+        "title": title,
+        "usermeta": {"embedOptions": {"renderer": "svg"}},
+        "layer": [
+            {"data": {"values": bars},
+             "mark": {"type": "bar", "opacity": 0.7, "color": BAR_COLOR},
+             "encoding": bar_encoding},
+            {"data": {"values": rules},
+             "mark": {"type": "rule", "strokeDash": [6, 4], "strokeWidth": 2},
+             "encoding": {"x": {"field": "value", "type": "quantitative"},
+                          "color": {"field": "marker", "type": "nominal", **color},
+                          "tooltip": [{"field": "marker"}, {"field": "value", "format": ",.2f"}]}},
+        ],
+    }
+
+
+@tracing.traced("chart")
+def histogram_chart(hist, markers, title, xlabel, ylabel=None, label=None):
+    """Draw a binned Monte Carlo distribution with its percentile markers."""
+    st.vega_lite_chart(histogram_spec(hist, markers, title, xlabel, ylabel, label), width="stretch")
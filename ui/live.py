@@ -0,0 +1,41 @@
+"""Simulations kept live across Streamlit reruns.
+
+A Deal Partner Monte Carlo is drawn once per "Run Monte Carlo" click. Its
+``DealSimulation`` is then shared by every rerun of that session, so a
+slider move only recomputes the stages downstream of the changed lever, on
+the same paths.
+
+The draws and stage arrays of each live simulation are charged against the
+result store's ``RESULT_STORE_MB`` cap, so stored paths are evicted to make
+room for them. The charge is released once Streamlit drops the simulation
+from its cache.
+"""
+import weakref
+
+import streamlit as st
+
+from core.engine import deal_partner
+from core.store import get_store
+
+MAX_LIVE = 64
+
+
+def _charge_key(seed, n_runs):
+    return f"live:deal_partner:{seed}:{n_runs}"
+
+
+@st.cache_resource(max_entries=MAX_LIVE, show_spinner=False)
+def deal_simulation(seed, n_runs):
+    """Live simulation for one click, keyed by its seed. If it is evicted, it
+    is rebuilt from the seed with the same draws."""
+    sim = deal_partner.DealSimulation(n_runs, seed)
+    weakref.finalize(sim, get_store().release, _charge_key(seed, n_runs))
+    return sim
+
+
+def update_deal(seed, n_runs, params):
+    """``DealResult`` for ``params`` on the live paths of click ``(seed, n_runs)``."""
+    sim = deal_simulation(seed, n_runs)
+    result = sim.update(params)
+    get_store().charge(_charge_key(seed, n_runs), sim.nbytes)
+    return result
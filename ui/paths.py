@@ -0,0 +1,29 @@
+"""Downloads of the Monte Carlo paths kept in the shared result store.
+
+Pages only hold a ``core.store`` handle for their paths. The CSV is built from
+the store when the download button is clicked (Streamlit runs the callable
+then), so no per-session copy of the paths is made on ordinary reruns.
+"""
+import streamlit as st
+
+from core.lazy import lazy_import
+from core.store import get_store
+
+pd = lazy_import("pandas")
+
+
+def paths_csv(handle):
+    """CSV bytes of the arrays stored under ``handle`` (one column per array)."""
+    arrays = get_store().get(handle)
+    if arrays is None:
+        return b""
+    return pd.DataFrame(arrays).to_csv(index_label="path").encode("utf-8")
+
+
+def paths_download(handle, file_name, key):
+    """A "Download simulated paths" button, or a note once the paths were evicted."""
+    if handle not in get_store():
+        st.caption("Simulated paths are no longer in memory; run the simulation again to download them.")
+        return
+    st.download_button("Download simulated paths (CSV)", data=lambda: paths_csv(handle),
+                       file_name=file_name, mime="text/csv", key=key, on_click="ignore")
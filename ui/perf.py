@@ -0,0 +1,27 @@
+"""In-app view of the page's tracing spans."""
+import streamlit as st
+
+from core import tracing
+from core.lazy import lazy_import
+
+pd = lazy_import("pandas")
+
+
+def perf_expander(page):
+    """Collapsed "Performance" table of ``page``'s spans, followed by the
+    process-wide gauges (e.g. the OpenAI client's queue and retries); hidden
+    unless tracing is on."""
+    if not tracing.enabled():
+        return
+    rows = tracing.snapshot(page)
+    with st.expander("Performance"):
+        if not rows:
+            st.caption("No spans recorded yet.")
+        else:
+            table = pd.DataFrame(rows).set_index("span")
+            for col in ("total_s", "p50_s", "p95_s", "p99_s"):
+                table[col.replace("_s", " ms")] = (table.pop(col) * 1000).round(1)
+            st.dataframe(table.drop(columns="page"))
+        for name, values in tracing.gauges().items():
+            st.caption(name)
+            st.dataframe(pd.Series(values, name="value").to_frame())
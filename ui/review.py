@@ -0,0 +1,77 @@
+"""AI persona reviews: streamed single reviews and concurrent panels."""
+import itertools
+import time
+
+import streamlit as st
+
+from core import tracing
+from core.llm import DEFAULT_MODEL, SYNTHESIS_SYSTEM, run_panel, synthesis_prompt
+
+
+@tracing.traced("ai_review")
+def stream_review(gateway, system, prompt, heading, key, spinner="AI persona reviewing...",
+                  model=DEFAULT_MODEL):
+    """Render a persona review under ``heading`` token by token.
+
+    The spinner only covers the wait for the first token. A "Stop review"
+    button (widget key ``f"{key}_stop"``) is shown while the review streams.
+    Clicking it reruns the page, which interrupts ``st.write_stream`` and
+    closes the stream so the backend request is dropped. Returns the text shown.
+    """
+    st.markdown(heading)
+    stop = st.empty()
+    stop.button("Stop review", key=f"{key}_stop")
+    stats = []
+    chunks = gateway.stream(system, prompt, model=model, on_stats=stats.append)
+    try:
+        with st.spinner(spinner):
+            first = next(chunks, "")
+        text = st.write_stream(itertools.chain([first], chunks))
+    except Exception as e:
+        st.error(f"OpenAI API error: {e}")
+        return ""
+    finally:
+        chunks.close()
+        stop.empty()
+    if stats:
+        s = stats[0]
+        st.caption(
+            f"{'cached · ' if s.cached else ''}first token {s.ttft or 0:.2f}s · "
+            f"total {s.total:.2f}s · {s.prompt_tokens} prompt / {s.completion_tokens} completion tokens"
+        )
+    return text
+
+
+def panel_review(gateway, persona_prompts, build_prompt, key, model=DEFAULT_MODEL):
+    """Ask every persona at once and show the answers side by side or merged.
+
+    ``build_prompt(persona)`` returns that persona's user prompt for the
+    current scenario; ``key`` keeps widget keys unique per page.
+    """
+    layout = st.radio("Panel output", ["Side by side", "Synthesized memo"],
+                      horizontal=True, key=f"{key}_panel_layout")
+    if not st.button(f"Ask the full AI panel ({', '.join(persona_prompts)})", key=f"{key}_panel"):
+        return
+    reviews = {p: (system, build_prompt(p)) for p, system in persona_prompts.items()}
+    start = time.perf_counter()
+    with st.spinner(f"{len(reviews)} AI personas reviewing in parallel..."), tracing.span("ai_panel"):
+        answers, stats = run_panel(gateway, reviews, model=model)
+    wall = time.perf_counter() - start
+
+    if layout == "Side by side":
+        for col, (persona, answer) in zip(st.columns(len(answers)), answers.items()):
+            col.markdown(f"**AI {persona}:**")
+            if isinstance(answer, BaseException):
+                col.error(f"OpenAI API error: {answer}")
+            else:
+                col.markdown(answer)
+    elif any(not isinstance(a, BaseException) for a in answers.values()):
+        for persona, answer in answers.items():
+            if isinstance(answer, BaseException):
+                st.error(f"{persona}: OpenAI API error: {answer}")
+        stream_review(gateway, SYNTHESIS_SYSTEM, synthesis_prompt(answers), "**AI Panel Memo:**",
+                      f"{key}_memo", spinner="Synthesizing panel memo...", model=model)
+    else:
+        st.error(f"OpenAI API error: {next(iter(answers.values()))}")
+    slowest = max((s.total for s in stats.values()), default=0.0)
+    st.caption(f"Panel of {len(answers)}: {wall:.2f}s wall time (slowest single review {slowest:.2f}s)")